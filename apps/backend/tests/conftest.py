@@ -4,6 +4,10 @@
 # It is used to define global test setup code or fixtures.
 # In this case, we use it to load environment variables from .env.
 import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
 
 # from thudbot_core.config import load_env  # Import robust .env loader
 if os.getenv("CI") != "true":
@@ -14,3 +18,40 @@ else:
 
 # Automatically load .env before any tests are executed.
 # This allows test files to use environment variables without repeating boilerplate.
+
+HINT_CSV = Path("data/Thudbot_Hint_Data_1.csv")
+
+
+@pytest.fixture(scope="session")
+def hint_path():
+    """Validated path to the hint CSV, stat'd once per session; skips if missing."""
+    if not HINT_CSV.is_file():
+        pytest.skip("Hint CSV file not found")
+    return HINT_CSV
+
+
+@pytest.fixture(scope="session")
+def hint_df(hint_path):
+    """Parse the hint CSV once per test session (all columns, so column checks can fail)."""
+    return pd.read_csv(hint_path, dtype=str)
+
+
+@pytest.fixture(scope="session")
+def agent_module():
+    """Import thudbot_core.agent once per session and share it across tests."""
+    try:
+        from thudbot_core import agent
+    except ImportError as e:
+        pytest.fail(f"Failed to import agent functions: {e}")
+    return agent
+
+
+@pytest.fixture(scope="session")
+def api_app():
+    """Import the FastAPI app once per session and share it across tests."""
+    try:
+        from thudbot_core.api import app
+    except (ImportError, SystemExit) as e:
+        # SystemExit: rate_limiter (imported by api) exits when Redis is unreachable
+        pytest.fail(f"Failed to import API components: {e!r}")
+    return app
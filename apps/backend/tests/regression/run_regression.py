@@ -38,7 +38,7 @@ class RawCollector:
         
     def run_collection(self):
         """Run all test questions and collect raw outputs"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         print(f"🚀 Starting Raw Collection - {self.timestamp}")
         print("=" * 60)
         
@@ -78,7 +78,7 @@ class RawCollector:
                 print(f"   ❌ Error: {str(e)}")
         
         # Calculate total duration
-        total_duration = time.time() - start_time
+        total_duration = (time.perf_counter_ns() - start_ns) / 1e9
         self.total_duration = total_duration
         
         # Save results
@@ -103,7 +103,7 @@ class RawCollector:
     
     def _collect_raw_data(self, question: str, expected_router: str, notes: str):
         """Collect raw data from a single question run"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         timestamp = datetime.now().strftime('%H:%M:%S')
         
         # Capture debug output by redirecting stdout temporarily
@@ -161,7 +161,7 @@ class RawCollector:
                 # For non-verified responses, capture first part of response as "hint attempt"
                 hint_text = final_output[:100] + "..." if len(final_output) > 100 else final_output
         
-        duration = time.time() - start_time
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
         
         return {
             'question': question,
@@ -73,7 +73,7 @@ class SecurityTestRunner:
         
     def _run_single_test(self, test_name, test_func):
         """Run a single security test and capture results"""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             test_func()
@@ -85,7 +85,7 @@ class SecurityTestRunner:
             error = str(e)
             print(f"   ❌ FAIL: {error}")
             
-        duration = time.time() - start_time
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
         print(f"   Duration: {duration:.2f}s")
         
         return {
@@ -7,30 +7,114 @@ different components to ensure the user never sees raw stack traces.
 """
 
 import os
+import re
 import sys
-import shutil
-from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 import time
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 
 
 try:
     from thudbot_core.app import run_hint_request
-    from thudbot_core.api import app as fastapi_app
-    from thudbot_core.agent import get_direct_hint_with_context
+    from thudbot_core.api import app as fastapi_app, ChatRequest
+    import thudbot_core.find_hint_node as find_hint_module
     from fastapi.testclient import TestClient
+    from pydantic import ValidationError
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Make sure you're running from the project root with dependencies installed")
     sys.exit(1)
 
+# Backend project root (apps/backend) and the .env file main() loads
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ENV_PATH = PROJECT_ROOT / ".env"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Mirrors the user_message limit enforced by ChatRequest in thudbot_core/api.py
+MAX_MESSAGE_CHARS = 5000
+
+# Invariant input vectors, built once at import
+MAX_INPUT = "Help me " * 625  # ~5000 characters
+OVERSIZED_INPUT = "Attack " * 1000  # ~7K characters
+BOUNDARY_INPUT = "x" * (MAX_MESSAGE_CHARS + 1)  # One character over the limit
+SPECIAL_INPUTS = (
+    "🎮💥🚀👾🔥" * 100,  # Emoji overload
+    "\x00\x01\x02\x03",   # Control characters
+    "SELECT * FROM users; DROP TABLE users;",  # SQL injection attempt
+    "<script>alert('xss')</script>",  # XSS attempt
+    "\\n\\r\\t" * 500     # Escape sequence spam
+)
+
+@contextmanager
+def swap_attr(obj, name, new):
+    """Temporarily replace obj.name with new, restoring the original on exit"""
+    original = getattr(obj, name)
+    setattr(obj, name, new)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+@contextmanager
+def swap_env(key, value):
+    """Temporarily set (or, with value=None, unset) an environment variable"""
+    original = os.environ.get(key)
+    if value is None:
+        os.environ.pop(key, None)
+    else:
+        os.environ[key] = value
+    try:
+        yield
+    finally:
+        if original is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = original
+
+@lru_cache(maxsize=1)
+def _get_cached_client():
+    """Build the FastAPI TestClient once per process and share it across testers.
+    
+    Unhandled server errors come back as the plain 500 a real client would see
+    rather than being re-raised into the tester.
+    """
+    return TestClient(fastapi_app, raise_server_exceptions=False)
+
+def _empty_rag_result(*args, **kwargs):
+    return {"response": "", "context": ""}
+
+def _failing_rag(*args, **kwargs):
+    raise Exception("Simulated RAG failure")
+
 class ErrorInjectionTester:
     """Systematically test error scenarios to ensure graceful handling"""
     
-    def __init__(self):
+    # Indicator lists compiled once into case-insensitive alternations
+    _STACK_TRACE_RE = re.compile("|".join(re.escape(indicator) for indicator in [
+        "Traceback (most recent call last):",
+        "File \"/", "File \"C:",  # File paths in stack traces
+        "line ", " in ",  # Stack trace line indicators
+        "AttributeError:", "TypeError:", "ValueError:",  # Common exception types
+        "KeyError:", "IndexError:", "NameError:",
+        "raise Exception", "Exception:", "Error:",
+        "site-packages/", "python/lib/",  # Package paths
+        "__traceback__", "tb_frame"
+    ]), re.IGNORECASE)
+    
+    _FRIENDLY_RE = re.compile("|".join(re.escape(indicator) for indicator in [
+        "sorry", "error occurred", "try again",
+        "something went wrong", "unable to", "cannot",
+        "issue", "problem", "zelda", "assistant",
+        "help", "clarification", "specific"
+    ]), re.IGNORECASE)
+    
+    def __init__(self, client=None):
         self.results = []
-        self.client = TestClient(fastapi_app)
+        self.client = client or _get_cached_client()
+        self._log_lines = []
         
     def run_all_error_tests(self):
         """Run comprehensive error injection testing"""
@@ -53,12 +137,14 @@ class ErrorInjectionTester:
             try:
                 test_method()
             except Exception as e:
-                print(f"❌ Test category failed: {e}")
+                self._log(f"❌ Test category failed: {e}")
                 self.results.append({
                     "category": category,
                     "status": "CATEGORY_FAILURE", 
                     "error": str(e)
                 })
+            finally:
+                self._flush_log()
         
         # Generate report
         self._generate_report()
@@ -72,67 +158,52 @@ class ErrorInjectionTester:
             ("Rate Limit Key", "rate_limited_key")  # Would need actual rate limited key
         ]
         
-        # Store original key securely (don't log this variable)
-        original_key = os.environ.get('OPENAI_API_KEY')
-        has_original_key = bool(original_key)  # Just track if we had one
-        
-        for case_name, bad_key in test_cases:
-            print(f"  🔬 Testing: {case_name}")
-            
-            try:
-                # Temporarily set bad API key
-                os.environ['OPENAI_API_KEY'] = bad_key
-                
-                # Test direct function call
-                response = run_hint_request("Help me find the bus token")
+        # Save the original key once and restore it once after all cases
+        with swap_env('OPENAI_API_KEY', None):
+            for case_name, bad_key in test_cases:
+                self._log(f"  🔬 Testing: {case_name}")
                 
-                # Check response doesn't contain stack trace
-                contains_stack_trace = self._contains_stack_trace(response)
-                has_user_friendly_message = self._has_user_friendly_error(response)
-                
-                result = {
-                    "test": f"openai_{case_name.lower().replace(' ', '_')}",
-                    "status": "PASS" if not contains_stack_trace and has_user_friendly_message else "FAIL",
-                    "response_length": len(response),
-                    "contains_stack_trace": contains_stack_trace,
-                    "user_friendly": has_user_friendly_message,
-                    "response_preview": response[:100]
-                }
-                self.results.append(result)
-                
-                print(f"    {'✅' if result['status'] == 'PASS' else '❌'} {case_name}: {result['status']}")
-                
-            except Exception as e:
-                # Even exceptions should be caught gracefully
-                result = {
-                    "test": f"openai_{case_name.lower().replace(' ', '_')}",
-                    "status": "FAIL",
-                    "error": str(e),
-                    "exception_type": type(e).__name__
-                }
-                self.results.append(result)
-                print(f"    ❌ {case_name}: Uncaught exception - {type(e).__name__}")
-            
-            finally:
-                # Restore original key (if we had one)
-                if has_original_key and original_key:
-                    os.environ['OPENAI_API_KEY'] = original_key
-                elif 'OPENAI_API_KEY' in os.environ:
-                    del os.environ['OPENAI_API_KEY']
+                try:
+                    # Set this case's bad API key (restored once after the loop)
+                    os.environ['OPENAI_API_KEY'] = bad_key
+                    
+                    # Test direct function call
+                    response = run_hint_request("Help me find the bus token")
+                    
+                    # Check response doesn't contain stack trace
+                    contains_stack_trace = self._contains_stack_trace(response)
+                    has_user_friendly_message = self._has_user_friendly_error(response)
                     
-        # Clear the key from memory as soon as we're done
-        if 'original_key' in locals():
-            original_key = None
+                    result = {
+                        "test": f"openai_{case_name.lower().replace(' ', '_')}",
+                        "status": "PASS" if not contains_stack_trace and has_user_friendly_message else "FAIL",
+                        "response_length": len(response),
+                        "contains_stack_trace": contains_stack_trace,
+                        "user_friendly": has_user_friendly_message,
+                        "response_preview": response[:100]
+                    }
+                    self.results.append(result)
+                    
+                    self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} {case_name}: {result['status']}")
+                    
+                except Exception as e:
+                    # Even exceptions should be caught gracefully
+                    result = {
+                        "test": f"openai_{case_name.lower().replace(' ', '_')}",
+                        "status": "FAIL",
+                        "error": str(e),
+                        "exception_type": type(e).__name__
+                    }
+                    self.results.append(result)
+                    self._log(f"    ❌ {case_name}: Uncaught exception - {type(e).__name__}")
     
     def test_rag_failures(self):
         """Test RAG system failure scenarios"""
-        print("  🔬 Testing: RAG Component Failures")
+        self._log("  🔬 Testing: RAG Component Failures")
         
-        # Test with mocked failures - fixed import path
-        with patch('agent.get_direct_hint_with_context') as mock_rag:
-            # Simulate RAG returning empty results
-            mock_rag.return_value = {"response": "", "context": ""}
-            
+        # Swap the function where find_hint_node looks it up (plain attribute swap, no MagicMock)
+        # Simulate RAG returning empty results
+        with swap_attr(find_hint_module, 'get_direct_hint_with_context', _empty_rag_result):
             try:
                 response = run_hint_request("Help me with the alien puzzle")
                 
@@ -142,7 +213,7 @@ class ErrorInjectionTester:
                     "response_preview": response[:100]
                 }
                 self.results.append(result)
-                print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Empty RAG Results: {result['status']}")
+                self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Empty RAG Results: {result['status']}")
                 
             except Exception as e:
                 result = {
@@ -151,12 +222,10 @@ class ErrorInjectionTester:
                     "error": str(e)
                 }
                 self.results.append(result)
-                print(f"    ❌ Empty RAG Results: Uncaught exception")
+                self._log(f"    ❌ Empty RAG Results: Uncaught exception")
         
-        # Test RAG throwing exceptions - fixed import path
-        with patch('agent.get_direct_hint_with_context') as mock_rag:
-            mock_rag.side_effect = Exception("Simulated RAG failure")
-            
+        # Test RAG throwing exceptions
+        with swap_attr(find_hint_module, 'get_direct_hint_with_context', _failing_rag):
             try:
                 response = run_hint_request("Help me with the space station")
                 
@@ -166,7 +235,7 @@ class ErrorInjectionTester:
                     "response_preview": response[:100]
                 }
                 self.results.append(result)
-                print(f"    {'✅' if result['status'] == 'PASS' else '❌'} RAG Exception: {result['status']}")
+                self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} RAG Exception: {result['status']}")
                 
             except Exception as e:
                 result = {
@@ -175,11 +244,11 @@ class ErrorInjectionTester:
                     "error": str(e)
                 }
                 self.results.append(result)
-                print(f"    ❌ RAG Exception: Uncaught exception")
+                self._log(f"    ❌ RAG Exception: Uncaught exception")
     
     def test_state_corruption(self):
         """Test malformed state and input scenarios"""
-        print("  🔬 Testing: State Corruption Scenarios")
+        self._log("  🔬 Testing: State Corruption Scenarios")
         
         # Test input validation limits - should handle gracefully
         
@@ -194,67 +263,52 @@ class ErrorInjectionTester:
             "response_preview": response.text[:100]
         }
         self.results.append(result)
-        print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Empty Input API: {result['status']}")
+        self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Empty Input API: {result['status']}")
         
         # Test max allowed input (5000 chars) - should work
-        max_input = "Help me " * 625  # ~5000 characters  
         try:
-            response = run_hint_request(max_input)
+            response = run_hint_request(MAX_INPUT)
             result = {
                 "test": "max_allowed_input",
                 "status": "PASS" if not self._contains_stack_trace(response) else "FAIL",
-                "input_length": len(max_input),
+                "input_length": len(MAX_INPUT),
                 "response_preview": response[:100]
             }
             self.results.append(result)
-            print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Max Allowed Input (5K): {result['status']}")
+            self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Max Allowed Input (5K): {result['status']}")
         except Exception as e:
             result = {"test": "max_allowed_input", "status": "FAIL", "error": str(e)}
             self.results.append(result)
-            print(f"    ❌ Max Allowed Input: Uncaught exception")
+            self._log(f"    ❌ Max Allowed Input: Uncaught exception")
         
         # Test oversized input via API (should get 422 validation error)
-        oversized_input = "Attack " * 1000  # ~7K characters
         response = self.client.post("/api/chat", 
-            json={"user_message": oversized_input, "session_id": "test"})
+            json={"user_message": OVERSIZED_INPUT, "session_id": "test"})
         
         result = {
             "test": "oversized_input_api",
             "status": "PASS" if response.status_code == 422 else "FAIL",  # Should reject with 422
             "status_code": response.status_code,
-            "input_length": len(oversized_input),
+            "input_length": len(OVERSIZED_INPUT),
             "response_preview": response.text[:100]
         }
         self.results.append(result)
-        print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Oversized Input API (7K): {result['status']}")
+        self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Oversized Input API (7K): {result['status']}")
         
-        # Test direct function with oversized input (should handle gracefully or raise)
-        massive_input = "Help me " * 10000  # ~70K characters
+        # Test the length boundary directly on the request model: one character
+        # over the limit must be rejected before any pipeline work happens
         try:
-            response = run_hint_request(massive_input)
-            result = {
-                "test": "massive_input_direct",
-                "status": "PASS" if not self._contains_stack_trace(response) else "FAIL",
-                "input_length": len(massive_input),
-                "response_preview": response[:100]
-            }
-            self.results.append(result)
-            print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Massive Input Direct (70K): {result['status']}")
-        except Exception as e:
-            result = {"test": "massive_input_direct", "status": "FAIL", "error": str(e)}
-            self.results.append(result)
-            print(f"    ❌ Massive Input Direct: Uncaught exception")
+            ChatRequest(user_message=BOUNDARY_INPUT)
+            result = {"test": "length_boundary_model", "status": "FAIL",
+                      "error": "Oversized message accepted by ChatRequest"}
+        except ValidationError:
+            result = {"test": "length_boundary_model", "status": "PASS",
+                      "input_length": len(BOUNDARY_INPUT)}
+        self.results.append(result)
+        self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Length Boundary (5K+1): {result['status']}")
         
         # Test special characters and encoding issues
-        special_inputs = [
-            "🎮💥🚀👾🔥" * 100,  # Emoji overload
-            "\x00\x01\x02\x03",   # Control characters
-            "SELECT * FROM users; DROP TABLE users;",  # SQL injection attempt
-            "<script>alert('xss')</script>",  # XSS attempt
-            "\\n\\r\\t" * 500     # Escape sequence spam
-        ]
-        
-        for i, special_input in enumerate(special_inputs):
+        for i, special_input in enumerate(SPECIAL_INPUTS):
             try:
                 response = run_hint_request(special_input)
                 result = {
@@ -263,80 +317,78 @@ class ErrorInjectionTester:
                     "response_preview": response[:100] if response else "EMPTY"
                 }
                 self.results.append(result)
-                print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Special Input {i}: {result['status']}")
+                self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Special Input {i}: {result['status']}")
             except Exception as e:
                 result = {"test": f"special_input_{i}", "status": "FAIL", "error": str(e)}
                 self.results.append(result)
-                print(f"    ❌ Special Input {i}: Uncaught exception")
+                self._log(f"    ❌ Special Input {i}: Uncaught exception")
+    
+    def _timed_chat_post(self, message):
+        """POST one message to /api/chat, returning (response, duration_ns)"""
+        start_ns = time.perf_counter_ns()
+        response = self.client.post("/api/chat", json={"user_message": message})
+        return response, time.perf_counter_ns() - start_ns
     
     def test_resource_limits(self):
         """Test resource exhaustion scenarios"""
-        print("  🔬 Testing: Resource Limit Scenarios")
-        
-        # Test rapid-fire requests (simulate high load)
-        print("    Testing rapid requests...")
-        for i in range(5):
-            try:
-                start_time = time.time()
-                response = run_hint_request(f"Quick test {i}")
-                duration = time.time() - start_time
-                
-                result = {
-                    "test": f"rapid_request_{i}",
-                    "status": "PASS" if not self._contains_stack_trace(response) else "FAIL",
-                    "duration": round(duration, 2),
-                    "response_preview": response[:50] if response else "EMPTY"
-                }
-                self.results.append(result)
-                
-            except Exception as e:
-                result = {"test": f"rapid_request_{i}", "status": "FAIL", "error": str(e)}
-                self.results.append(result)
-                print(f"    ❌ Rapid Request {i}: Uncaught exception")
-            
-            # Small delay to avoid overwhelming
-            time.sleep(0.1)
+        self._log("  🔬 Testing: Resource Limit Scenarios")
+        
+        # Test rapid-fire requests (simulate high load) through the API layer,
+        # fanned out concurrently so the rate limiter sees them together
+        self._log("    Testing rapid requests...")
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = {
+                executor.submit(self._timed_chat_post, f"Quick test {i}"): i
+                for i in range(5)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    response, duration_ns = future.result()
+                    body = response.text
+                    result = {
+                        "test": f"rapid_request_{i}",
+                        "status": "PASS" if not self._contains_stack_trace(body) else "FAIL",
+                        "status_code": response.status_code,
+                        "duration_ns": duration_ns,
+                        "response_preview": body[:50] if body else "EMPTY"
+                    }
+                    self.results.append(result)
+                    
+                except Exception as e:
+                    result = {"test": f"rapid_request_{i}", "status": "FAIL", "error": str(e)}
+                    self.results.append(result)
+                    self._log(f"    ❌ Rapid Request {i}: Uncaught exception")
         
-        print(f"    ✅ Rapid requests completed")
+        self._log(f"    ✅ Rapid requests completed")
     
     def test_environment_issues(self):
         """Test environment configuration problems"""
-        print("  🔬 Testing: Environment Issues")
-        
-        # Test missing .env file - need to go up to project root
-        project_root = os.path.join(os.path.dirname(__file__), '..', '..')
-        env_path = os.path.join(project_root, '.env')
-        backup_path = os.path.join(project_root, '.env.backup')
-        
-        original_dotenv = os.path.exists(env_path)
-        if original_dotenv:
-            # Temporarily rename .env
-            shutil.move(env_path, backup_path)
+        self._log("  🔬 Testing: Environment Issues")
         
+        # Simulate a missing .env in-process: config only calls load_dotenv at
+        # import (long done), so what a request sees is the key .env would
+        # have supplied being absent; nothing on disk is touched
         try:
-            response = run_hint_request("Test without .env")
+            with swap_env('OPENAI_API_KEY', None):
+                response = run_hint_request("Test without .env")
             result = {
                 "test": "missing_env_file",
                 "status": "PASS" if not self._contains_stack_trace(response) else "FAIL",
                 "response_preview": response[:100]
             }
             self.results.append(result)
-            print(f"    {'✅' if result['status'] == 'PASS' else '❌'} Missing .env: {result['status']}")
+            self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} Missing .env: {result['status']}")
             
         except Exception as e:
             result = {"test": "missing_env_file", "status": "FAIL", "error": str(e)}
             self.results.append(result)
-            print(f"    ❌ Missing .env: Uncaught exception")
-        
-        finally:
-            # Restore .env if it existed
-            if original_dotenv and os.path.exists(backup_path):
-                shutil.move(backup_path, env_path)
+            self._log(f"    ❌ Missing .env: Uncaught exception")
     
     
     def test_frontend_errors(self):
         """Test FastAPI error handling"""
-        print("  🔬 Testing: Frontend API Error Handling")
+        self._log("  🔬 Testing: Frontend API Error Handling")
         
         # Test API with extra field (api_key should be ignored)
         response = self.client.post("/api/chat", 
@@ -349,7 +401,7 @@ class ErrorInjectionTester:
             "response_preview": response.text[:100]
         }
         self.results.append(result)
-        print(f"    {'✅' if result['status'] == 'PASS' else '❌'} API Extra Field Ignored: {result['status']}")
+        self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} API Extra Field Ignored: {result['status']}")
         
         # Test API with malformed request (missing required field)
         response = self.client.post("/api/chat", json={"invalid": "request"})
@@ -361,58 +413,39 @@ class ErrorInjectionTester:
             "response_preview": response.text[:100]
         }
         self.results.append(result)
-        print(f"    {'✅' if result['status'] == 'PASS' else '❌'} API Malformed Request: {result['status']}")
+        self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} API Malformed Request: {result['status']}")
         
         # Test API with missing environment variable (simulate no API key)
-        original_key = os.environ.get('OPENAI_API_KEY')
-        try:
-            # Temporarily remove API key
-            if 'OPENAI_API_KEY' in os.environ:
-                del os.environ['OPENAI_API_KEY']
-            
+        with swap_env('OPENAI_API_KEY', None):
             response = self.client.post("/api/chat", json={"user_message": "test without api key"})
-            
-            result = {
-                "test": "api_no_env_key",
-                "status": "PASS" if response.status_code == 503 else "FAIL",  # Should return 503 for missing key
-                "status_code": response.status_code,
-                "response_preview": response.text[:100]
-            }
-            self.results.append(result)
-            print(f"    {'✅' if result['status'] == 'PASS' else '❌'} API No Env Key: {result['status']}")
-            
-        finally:
-            # Restore original key
-            if original_key:
-                os.environ['OPENAI_API_KEY'] = original_key
+        
+        result = {
+            "test": "api_no_env_key",
+            "status": "PASS" if response.status_code == 503 else "FAIL",  # Should return 503 for missing key
+            "status_code": response.status_code,
+            "response_preview": response.text[:100]
+        }
+        self.results.append(result)
+        self._log(f"    {'✅' if result['status'] == 'PASS' else '❌'} API No Env Key: {result['status']}")
+    
+    def _log(self, line: str):
+        """Buffer a status line; flushed once per category"""
+        self._log_lines.append(line)
+    
+    def _flush_log(self):
+        """Write buffered status lines to stdout in a single call"""
+        if self._log_lines:
+            sys.stdout.write("\n".join(self._log_lines) + "\n")
+            sys.stdout.flush()
+            self._log_lines.clear()
     
     def _contains_stack_trace(self, response: str) -> bool:
         """Check if response contains raw stack trace indicators"""
-        stack_trace_indicators = [
-            "Traceback (most recent call last):",
-            "File \"/", "File \"C:",  # File paths in stack traces
-            "line ", " in ",  # Stack trace line indicators
-            "AttributeError:", "TypeError:", "ValueError:",  # Common exception types
-            "KeyError:", "IndexError:", "NameError:",
-            "raise Exception", "Exception:", "Error:",
-            "site-packages/", "python/lib/",  # Package paths
-            "__traceback__", "tb_frame"
-        ]
-        
-        response_lower = response.lower()
-        return any(indicator.lower() in response_lower for indicator in stack_trace_indicators)
+        return bool(self._STACK_TRACE_RE.search(response))
     
     def _has_user_friendly_error(self, response: str) -> bool:
         """Check if response has user-friendly error handling"""
-        friendly_indicators = [
-            "sorry", "error occurred", "try again",
-            "something went wrong", "unable to", "cannot",
-            "issue", "problem", "zelda", "assistant",
-            "help", "clarification", "specific"
-        ]
-        
-        response_lower = response.lower()
-        return any(indicator in response_lower for indicator in friendly_indicators)
+        return bool(self._FRIENDLY_RE.search(response))
     
     def _generate_report(self):
         """Generate comprehensive error testing report"""
@@ -435,25 +468,33 @@ class ErrorInjectionTester:
                     print(f"  - {result['test']}: {result.get('error', 'See details above')}")
         
         # Generate timestamp and save to results directory
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_dir = os.path.join(os.path.dirname(__file__), 'results')
-        os.makedirs(results_dir, exist_ok=True)
-        filename = os.path.join(results_dir, f"error_injection_results_{timestamp}.log")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        RESULTS_DIR.mkdir(exist_ok=True)
+        filename = RESULTS_DIR / f"error_injection_results_{timestamp}.log"
         
         print(f"\n📄 Full results saved to: {filename}")
         
-        # Save detailed log with timestamp
+        # Build the detailed log in memory and write it out in one call
+        lines = [
+            f"Error Injection Test Results - {now.strftime('%Y-%m-%d %H:%M:%S')}",
+            "=" * 60,
+            "",
+        ]
+        for result in self.results:
+            test_name = result.get('test', result.get('category', 'unknown_test'))
+            lines.append(f"Test: {test_name}")
+            lines.append(f"Status: {result.get('status', 'UNKNOWN')}")
+            for key, value in result.items():
+                if key == 'duration_ns':
+                    # Raw integer ns kept in results; format only for the report
+                    lines.append(f"  duration_ms: {value / 1e6:.2f}")
+                elif key not in ['test', 'status', 'category']:
+                    lines.append(f"  {key}: {value}")
+            lines.append("")
+        
         with open(filename, "w") as f:
-            f.write(f"Error Injection Test Results - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n\n")
-            for result in self.results:
-                test_name = result.get('test', result.get('category', 'unknown_test'))
-                f.write(f"Test: {test_name}\n")
-                f.write(f"Status: {result.get('status', 'UNKNOWN')}\n")
-                for key, value in result.items():
-                    if key not in ['test', 'status', 'category']:
-                        f.write(f"  {key}: {value}\n")
-                f.write("\n")
+            f.write("\n".join(lines) + "\n")
 
 def main():
     """Main entry point"""
@@ -461,13 +502,15 @@ def main():
     print("This will systematically test error scenarios to ensure graceful handling")
     print("=" * 60)
     
-    # Load environment from project root
-    project_root = os.path.join(os.path.dirname(__file__), '..', '..')
-    try:
-        from dotenv import load_dotenv
-        load_dotenv(dotenv_path=os.path.join(project_root, ".env"), override=True)
-    except ImportError:
-        print("⚠️  Warning: dotenv not available")
+    # Load environment from project root. Skipped when OPENAI_API_KEY is
+    # already set (e.g. CI-injected); otherwise .env wins as before,
+    # including over an empty key left in the shell
+    if not os.environ.get("OPENAI_API_KEY"):
+        try:
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path=ENV_PATH, override=True)
+        except ImportError:
+            print("⚠️  Warning: dotenv not available")
     
     tester = ErrorInjectionTester()
     tester.run_all_error_tests()
@@ -1,7 +1,6 @@
 # tests/test_functions.py
 
 import pytest
-import pandas as pd
 from pathlib import Path
 
 def test_hint_data_exists():
@@ -12,14 +11,9 @@ def test_hint_data_exists():
     # Test that file is not empty
     assert hint_file.stat().st_size > 0, "Hint CSV file should not be empty"
 
-def test_hint_data_structure():
+def test_hint_data_structure(hint_df):
     """Test that the hint CSV has the expected structure."""
-    hint_file = Path("data/Thudbot_Hint_Data_1.csv")
-    
-    if not hint_file.exists():
-        pytest.skip("Hint CSV file not found")
-    
-    df = pd.read_csv(hint_file)
+    df = hint_df
     
     # Test that we have data
     assert len(df) > 0, "Hint CSV should contain data"
@@ -29,22 +23,14 @@ def test_hint_data_structure():
     for col in expected_columns:
         assert col in df.columns, f"Column '{col}' should exist in hint CSV"
 
-def test_agent_imports():
+def test_agent_imports(agent_module):
     """Test that agent module imports correctly."""
-    try:
-        from thudbot_core.agent import get_direct_hint, initialize_rag_only
-        assert callable(get_direct_hint), "get_direct_hint should be callable"
-        assert callable(initialize_rag_only), "initialize_rag_only should be callable"
-    except ImportError as e:
-        pytest.fail(f"Failed to import agent functions: {e}")
+    assert callable(agent_module.get_direct_hint), "get_direct_hint should be callable"
+    assert callable(agent_module.initialize_rag_only), "initialize_rag_only should be callable"
 
-def test_api_imports():
+def test_api_imports(api_app):
     """Test that API module imports correctly."""
-    try:
-        from thudbot_core.api import app
-        assert app is not None, "FastAPI app should be created"
-    except ImportError as e:
-        pytest.fail(f"Failed to import API components: {e}")
+    assert api_app is not None, "FastAPI app should be created"
 
 def test_required_files_exist():
     """Test that all required project files exist."""
@@ -89,40 +75,31 @@ def test_required_files_exist():
     for file_path in required_files:
         assert Path(file_path).exists(), f"Required file {file_path} should exist"
 
-def test_agent_initialization():
-    """Test that RAG system can be initialized without API calls."""
-    # Test basic RAG setup without requiring API keys
-    try:
-        from thudbot_core.agent import initialize_rag_only
-        # This should work even without API keys (validates imports, data loading, etc.)
-        rag_chain = initialize_rag_only()
-        assert rag_chain is not None, "RAG chain should be created"
-    except Exception as e:
-        msg = str(e)
-        
-        # Skip if backend is running and has the database locked
-        if "already accessed by another instance" in msg:
-            pytest.skip(
-                "Qdrant DB is locked (backend is running). "
-                "This is expected - shut down backend to test isolated initialization."
-            )
-        # Skip if API key is missing
-        elif "API key" in msg or "api_key" in msg:
-            pytest.skip(f"RAG initialization skipped - missing API key: {e}")
-        # Fail for any other unexpected error
-        else:
-            pytest.fail(f"RAG initialization failed unexpectedly: {e}")
+class _FakeRetrievalResponse:
+    """Minimal stand-in for a requests.Response from the retrieval API."""
+    status_code = 200
+
+    def json(self):
+        return {"collection_name": "test_collection", "vectors_count": 0}
+
+def test_agent_initialization(monkeypatch, agent_module):
+    """Test that the RAG chain is wired up without contacting the retrieval API."""
+    # Stub the health/meta round-trips and supply a dummy key; nothing below
+    # talks to OpenAI until the chain is invoked
+    monkeypatch.setattr(agent_module._retrieval_session, "get",
+                        lambda url, **kwargs: _FakeRetrievalResponse())
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-dummy")
+
+    rag_chain = agent_module.initialize_rag_only()
+    assert rag_chain is not None, "RAG chain should be created"
+    assert callable(getattr(rag_chain, "invoke", None)), "RAG chain should be invokable"
 
-def test_fastapi_app_creation():
+def test_fastapi_app_creation(api_app):
     """Test that FastAPI app can be created without starting server."""
-    try:
-        from thudbot_core.api import app
-        assert app is not None, "FastAPI app should be created"
-        # Check that basic routes exist
-        routes = [route.path for route in app.routes]
-        assert "/api/chat" in routes, "API chat endpoint should exist"
-    except Exception as e:
-        pytest.fail(f"FastAPI app creation failed: {e}")
+    assert api_app is not None, "FastAPI app should be created"
+    # Check that basic routes exist
+    routes = [route.path for route in api_app.routes]
+    assert "/api/chat" in routes, "API chat endpoint should exist"
 
 def test_basic_math():
     """Simple test to ensure pytest is working."""
@@ -205,7 +205,7 @@ def get_all_game_questions():
     questions.extend([q[0] for q in CORE_GAME_QUESTIONS])
     questions.extend([q[0] for q in SPECIFIC_GAME_QUESTIONS])
     questions.extend([case["question"] for case in VERIFICATION_EDGE_CASES if case["test_type"] == "VERIFIED"])
-    return list(set(questions))  # Remove duplicates
+    return list(dict.fromkeys(questions))  # Remove duplicates, keep first-seen order
 
 def get_all_off_topic_questions():
     """Get all questions that should be routed as off-topic"""
@@ -213,7 +213,7 @@ def get_all_off_topic_questions():
     questions.extend(OFF_TOPIC_QUESTIONS)
     questions.extend(VAGUE_QUESTIONS)
     questions.extend(HALLUCINATION_RISK_QUESTIONS)
-    return list(set(questions))  # Remove duplicates
+    return list(dict.fromkeys(questions))  # Remove duplicates, keep first-seen order
 
 def get_test_questions_by_category(category):
     """Get test questions by category name"""
@@ -12,7 +12,7 @@ except ImportError:
     pass
 
 # Core imports
-from langchain_openai import ChatOpenAI
+from thudbot_core.langgraph_flow import get_chat_model
 from langchain.retrievers.multi_query import MultiQueryRetriever
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.prompts import ChatPromptTemplate
@@ -28,6 +28,10 @@ import logging
 # Global components for RAG-only system
 _multi_query_retrieval_chain = None
 
+# Shared HTTP session so the multi-query fan-out reuses keep-alive connections
+# to the retrieval API instead of opening a new TCP connection per request
+_retrieval_session = requests.Session()
+
 class HTTPRetriever(BaseRetriever):
     """Custom retriever that calls retrieval API via HTTP."""
     
@@ -37,7 +41,7 @@ class HTTPRetriever(BaseRetriever):
     def _get_relevant_documents(self, query: str):
         """Retrieve documents via HTTP request to retrieval API."""
         try:
-            response = requests.post(
+            response = _retrieval_session.post(
                 f"{self.api_url}/retrieve",
                 json={"query": query, "k": self.k},
                 timeout=30
@@ -96,12 +100,12 @@ def initialize_rag_only(api_key=None):
     
     # Check retrieval API health and get collection info
     try:
-        response = requests.get(f"{RETRIEVAL_API_URL}/health", timeout=10)
+        response = _retrieval_session.get(f"{RETRIEVAL_API_URL}/health", timeout=10)
         if response.status_code != 200:
             raise RuntimeError(f"Retrieval API health check failed: {response.status_code}")
         
         # Get collection metadata
-        meta_response = requests.get(f"{RETRIEVAL_API_URL}/meta", timeout=10)
+        meta_response = _retrieval_session.get(f"{RETRIEVAL_API_URL}/meta", timeout=10)
         if meta_response.status_code == 200:
             meta = meta_response.json()
             collection_name = meta.get("collection_name") or meta.get("collection") or "unknown"
@@ -125,7 +129,7 @@ def initialize_rag_only(api_key=None):
     naive_retriever = HTTPRetriever(api_url=RETRIEVAL_API_URL, k=5)
     
     # Multi-query logic stays in backend (generates alternative queries, calls API N times)
-    chat_model = ChatOpenAI(model="gpt-4.1-nano")
+    chat_model = get_chat_model("gpt-4.1-nano")
     multi_query_retriever = MultiQueryRetriever.from_llm(
         retriever=naive_retriever, llm=chat_model
     )
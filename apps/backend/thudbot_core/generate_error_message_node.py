@@ -25,7 +25,7 @@ Notes:
 """
 from thudbot_core.state import LangGraphState
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from thudbot_core.langgraph_flow import get_chat_model
 from langsmith import traceable
 import openai
 
@@ -39,7 +39,7 @@ def generate_error_message_node(state: LangGraphState) -> LangGraphState:
     print(f"❌ Generating error message for verification failure...")
     
     try:
-        chat_model = ChatOpenAI(model="gpt-4o-mini")
+        chat_model = get_chat_model("gpt-4o-mini")
         
         # Create error message template
         error_template = ChatPromptTemplate.from_template("""
@@ -34,6 +34,9 @@ Functions:
   Detects smalltalk or meta questions using pattern matching.
 - classify_intent(user_input)
   Uses an LLM-based classifier to label input as GAME_RELATED or OFF_TOPIC.
+- get_chat_model(model)
+  Returns a shared ChatOpenAI client so nodes reuse one HTTP connection pool
+  per model instead of constructing a new client on every graph run.
 
 Usage:
 - Imported and used primarily by router_node to inform routing decisions.
@@ -48,6 +51,9 @@ Notes:
   behavior changes.
 """
 
+import os
+from functools import lru_cache
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 import openai
@@ -104,6 +110,19 @@ STOP_WORDS = {
     "please", "help", "still", "again", "and", "or", "but"
 }
 
+@lru_cache(maxsize=8)
+def _cached_chat_model(model: str, api_key: str) -> ChatOpenAI:
+    return ChatOpenAI(model=model)
+
+def get_chat_model(model: str) -> ChatOpenAI:
+    """Return a shared ChatOpenAI client for the given model
+    
+    Clients are cached per (model, OPENAI_API_KEY) so repeated graph runs reuse the
+    same connection pool, while a changed key (e.g. error-injection tests) still
+    gets a fresh client.
+    """
+    return _cached_chat_model(model, os.getenv("OPENAI_API_KEY", ""))
+
 # TODO, maybe. 20250820.
 # below template is used to classify if input is about The Space Bar game or off-topic. 
 # it is working well but I am not sure if it is the best way to do this. 
@@ -170,7 +189,7 @@ def classify_intent(user_input: str) -> str:
     """Use LLM to classify if input is about The Space Bar game or off-topic"""
     
     try:
-        chat_model = ChatOpenAI(model="gpt-4.1-nano")  # testing with nano for now
+        chat_model = get_chat_model("gpt-4.1-nano")  # testing with nano for now
     
         template = ChatPromptTemplate.from_template("""
         You are a classifier for The Space Bar adventure game. Determine if the user's input is:
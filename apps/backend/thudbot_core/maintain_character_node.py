@@ -25,7 +25,7 @@ Notes:
 """
 from thudbot_core.state import LangGraphState
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from thudbot_core.langgraph_flow import get_chat_model
 from langsmith import traceable
 import openai
 
@@ -38,7 +38,7 @@ def maintain_character_node(state: LangGraphState) -> LangGraphState:
     print(f"🎭 Rewriting in Zelda's voice...")
     
     try:
-        chat_model = ChatOpenAI(model="gpt-4o-mini")
+        chat_model = get_chat_model("gpt-4o-mini")
         template = ChatPromptTemplate.from_template("""
         You are Zelda, the Personal Digital Assistant (PDA) in The Space Bar adventure game by Boffo Games. 
         You are NOT the princess from Legend of Zelda - you are a sassy AI assistant helping detective Alias Node.
@@ -29,7 +29,7 @@ Notes:
 """
 
 from thudbot_core.state import LangGraphState
-from langchain_openai import ChatOpenAI
+from thudbot_core.langgraph_flow import get_chat_model
 from langchain_core.prompts import ChatPromptTemplate
 from langsmith import traceable
 import openai
@@ -47,7 +47,7 @@ def verify_correctness_node(state: LangGraphState) -> LangGraphState:
     
     try:
         # Use LLM to verify if the current hint aligns with retrieved context
-        chat_model = ChatOpenAI(model="gpt-4o-mini")
+        chat_model = get_chat_model("gpt-4o-mini")
         
         verification_template = ChatPromptTemplate.from_template("""
         You are a fact-checking system for a game hint system. Your job is to determine if a generated hint appropriately matches the user's question specificity and is based on reliable game data.
@@ -62,7 +62,7 @@ class RetrieverClient:
         results = []
         for hit in search_results:
             results.append({
-                "chunk_id": hit.id,
+                "chunk_id": str(hit.id),  # Point ids may be UUID strings or integers
                 "text": hit.payload.get("page_content", ""),
                 "metadata": hit.payload.get("metadata", {}),
                 "score": hit.score
@@ -1,67 +1,302 @@
 """
 Build-time utilities for RAG document processing.
 
-Provides CSV loading and Qdrant collection creation.
+Provides CSV loading, batched embedding, and Qdrant collection creation.
 Used ONLY by build scripts, never by runtime code.
 
 DO NOT import from apps.backend, thudbot_core, or tools.
 """
-from typing import List
+import asyncio
+import hashlib
+import sys
+import uuid
+from collections import Counter
+from typing import List, Optional
 from pathlib import Path
 
-from langchain_community.document_loaders.csv_loader import CSVLoader
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
 from langchain_community.vectorstores import Qdrant
 from langchain.schema import Document
 
+from rag_utils.loader import METADATA_COLLECTION_SUFFIX
+
+# Embedding errors worth retrying: rate limits and transient connection
+# failures. Anything else (bad key, bad input) fails immediately.
+try:
+    import openai
+    RETRYABLE_EMBEDDING_ERRORS = (
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.APITimeoutError,
+        openai.InternalServerError,
+        ConnectionError,
+        TimeoutError,
+    )
+except ImportError:
+    # Local-only environments without the OpenAI SDK
+    RETRYABLE_EMBEDDING_ERRORS = (ConnectionError, TimeoutError)
+
+# Qdrant's default indexing threshold (KB of vectors), restored after bulk upload
+INDEXING_THRESHOLD = 20000
+
 
 def load_csv_documents(
     csv_path: str,
-    metadata_columns: List[str]
+    metadata_columns: List[str],
+    intern_columns: Optional[List[str]] = None
 ):
     """
     Load documents from CSV file with metadata columns.
     
+    Parses with pandas' C reader and builds one Document per row in a
+    single pass. Output matches LangChain's CSVLoader: page_content is
+    "column: value" lines for every non-metadata column, and metadata
+    holds source, row index, and the requested columns as raw strings.
+    
     Args:
         csv_path: Path to CSV file
         metadata_columns: List of column names to extract as metadata
+        intern_columns: Metadata columns whose values repeat across rows
+            (character, planet, ...); these are interned so equal values
+            share one string. Leave long, mostly unique columns out.
         
     Returns:
         List of Document objects
     """
-    loader = CSVLoader(
-        file_path=csv_path,
-        metadata_columns=metadata_columns
-    )
-    return loader.load()
+    # Build-only dependency (backend dev extra); imported here so importing
+    # this module works in runtime-only installs
+    import pandas as pd
+    
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_filter=False, engine="c")
+    
+    columns = df.columns.tolist()
+    for col in metadata_columns:
+        if col not in columns:
+            raise ValueError(f"Metadata column '{col}' not found in CSV file.")
+    
+    metadata_set = set(metadata_columns)
+    content_fields = [(i, col.strip()) for i, col in enumerate(columns) if col not in metadata_set]
+    intern_set = set(intern_columns or ())
+    metadata_fields = [(columns.index(col), col, col in intern_set) for col in metadata_columns]
+    source = str(csv_path)
+    
+    documents = []
+    for row_index, row in enumerate(df.itertuples(index=False, name=None)):
+        content = "\n".join(f"{name}: {row[i].strip()}" for i, name in content_fields)
+        metadata = {"source": source, "row": row_index}
+        for i, col, intern in metadata_fields:
+            metadata[col] = sys.intern(row[i]) if intern else row[i]
+        documents.append(Document(page_content=content, metadata=metadata))
+    
+    return documents
+
+
+async def aembed_documents_in_batches(
+    embeddings,
+    texts: List[str],
+    batch_size: int = 256,
+    concurrency: int = 10,
+    max_retries: int = 5
+) -> List[List[float]]:
+    """
+    Embed texts in concurrent batches.
+    
+    Duplicate texts are embedded once and their vector reused. Each batch
+    of unique texts is sent through embeddings.aembed_documents(); at most
+    `concurrency` batches are in flight at once so the provider's rate
+    limits are respected, and a batch that hits a rate-limit or transient
+    connection error is retried with randomized exponential backoff.
+    Output order matches input order.
+    
+    Args:
+        embeddings: Embeddings function to use
+        texts: Texts to embed
+        batch_size: Number of texts per request
+        concurrency: Maximum number of batches in flight
+        max_retries: Attempts per batch before the error is raised
+        
+    Returns:
+        List of embedding vectors, one per input text
+    """
+    from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def embed_batch(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            async for attempt in AsyncRetrying(
+                retry=retry_if_exception_type(RETRYABLE_EMBEDDING_ERRORS),
+                wait=wait_random_exponential(min=1, max=60),
+                stop=stop_after_attempt(max_retries),
+                reraise=True
+            ):
+                with attempt:
+                    return await embeddings.aembed_documents(batch)
+    
+    # Embed each distinct text once (first-seen order), then fan back out
+    unique_texts = list(dict.fromkeys(texts))
+    batches = [unique_texts[i:i + batch_size] for i in range(0, len(unique_texts), batch_size)]
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    vector_by_text = dict(zip(
+        unique_texts,
+        (vector for batch_vectors in results for vector in batch_vectors)
+    ))
+    return [vector_by_text[text] for text in texts]
+
+
+def point_ids_for_documents(documents: List) -> List:
+    """
+    Derive deterministic 64-bit Qdrant point ids from document chunk_ids.
+    
+    chunk_id is not unique on its own (every hint level of a CSV question
+    shares one), so the n-th occurrence of a chunk_id is hashed together
+    with n. Rebuilding from the same inputs reproduces the same ids.
+    Falls back to random UUIDs if any document lacks a chunk_id.
+    
+    Args:
+        documents: List of Document objects
+        
+    Returns:
+        List of point ids aligned with documents
+    """
+    if not all(doc.metadata.get("chunk_id") for doc in documents):
+        return [uuid.uuid4().hex for _ in documents]
+    
+    occurrences = Counter()
+    ids = []
+    for doc in documents:
+        chunk_id = doc.metadata["chunk_id"]
+        key = f"{chunk_id}#{occurrences[chunk_id]}"
+        occurrences[chunk_id] += 1
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        ids.append(int.from_bytes(digest, "big"))
+    
+    if len(set(ids)) != len(ids):
+        raise ValueError("Point id collision while hashing chunk_ids")
+    return ids
 
 
 def upsert_documents_to_collection(
     qdrant_url: str,
     collection_name: str,
     documents: List,
-    embeddings
+    embeddings,
+    vectors: Optional[List[List[float]]] = None,
+    batch_size: int = 256,
+    parallel: int = 4,
+    client: Optional[QdrantClient] = None,
+    on_disk: bool = False,
+    quantization: str = "none"
 ):
     """
     Create or update Qdrant collection with documents on server.
     
+    When `vectors` is given (precomputed, aligned with `documents`), the
+    collection is created directly and points are streamed with
+    QdrantClient.upload_collection in batches across parallel workers,
+    skipping LangChain's embedding pass. By default that collection keeps
+    float32 vectors and the HNSW index in RAM; on_disk and quantization
+    trade some precision/latency for memory on large collections.
+    Payloads use the same page_content/metadata layout as
+    Qdrant.from_documents, so retrieval is unaffected.
+    
     Args:
         qdrant_url: Qdrant server URL (e.g., "http://localhost:6333")
         collection_name: Name of the collection
         documents: List of Document objects to add
         embeddings: Embeddings function to use
+        vectors: Optional precomputed embedding per document
+        batch_size: Points per upload request (precomputed-vector path)
+        parallel: Number of parallel upload workers (precomputed-vector path)
+        client: Optional existing QdrantClient to reuse (precomputed-vector
+            path); defaults to a new gRPC-preferring client for qdrant_url
+        on_disk: Keep original vectors and the HNSW graph on disk
+            (precomputed-vector path)
+        quantization: "none" or "scalar" - keep an int8 quantized copy of
+            the vectors in RAM for search (precomputed-vector path)
         
     Returns:
         Qdrant vectorstore instance
     """
-    # Create vectorstore on server
-    vectorstore = Qdrant.from_documents(
-        documents=documents,
-        embedding=embeddings,
-        url=qdrant_url,
-        collection_name=collection_name
+    if vectors is None:
+        # Legacy path: let LangChain embed and upload
+        vectorstore = Qdrant.from_documents(
+            documents=documents,
+            embedding=embeddings,
+            url=qdrant_url,
+            collection_name=collection_name
+        )
+        return vectorstore
+    
+    if not documents or len(vectors) != len(documents):
+        raise ValueError(
+            f"Expected one vector per document, got {len(vectors)} vectors "
+            f"for {len(documents)} documents"
+        )
+    
+    if quantization not in ("none", "scalar"):
+        raise ValueError(f"Invalid quantization: {quantization}. Must be 'none' or 'scalar'")
+    
+    import numpy as np
+    
+    vector_array = np.asarray(vectors, dtype=np.float32)
+    
+    # Scalar quantization keeps an int8 copy in RAM for search (rescored
+    # against the float32 originals), which changes scores slightly
+    quantization_config = None
+    if quantization == "scalar":
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    
+    client = client or QdrantClient(url=qdrant_url, prefer_grpc=True)
+    # Indexing is deferred during the bulk upload and re-enabled afterwards
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(
+            size=vector_array.shape[1],
+            distance=Distance.COSINE,
+            on_disk=on_disk
+        ),
+        quantization_config=quantization_config,
+        hnsw_config=HnswConfigDiff(on_disk=on_disk),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+    )
+    client.upload_collection(
+        collection_name=collection_name,
+        vectors=vector_array,
+        payload=[
+            {"page_content": doc.page_content, "metadata": doc.metadata}
+            for doc in documents
+        ],
+        ids=point_ids_for_documents(documents),
+        batch_size=batch_size,
+        parallel=parallel
+    )
+    client.update_collection(
+        collection_name=collection_name,
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD)
     )
     
-    return vectorstore
+    return Qdrant(
+        client=client,
+        collection_name=collection_name,
+        embeddings=embeddings
+    )
 
 
 def chunk_text_by_lines(
@@ -107,55 +342,39 @@ def chunk_text_by_lines(
     file_stem = source_name.rsplit(".", 1)[0]
     source_id = file_stem.upper()
     
-    # Generate chunks with overlap
-    chunks = []
-    chunk_index = 0
+    # Validate that we can assign chunk_id (REQUIRED invariant)
+    if not source_id:
+        raise ValueError(
+            f"Cannot assign chunk_id: source_id is empty or None. "
+            f"source_name={source_name}"
+        )
     
-    start = 0
-    while start < len(lines):
-        # Get chunk_size lines starting from start position
-        end = start + chunk_size
-        chunk_lines = lines[start:end]
-        
-        # Join lines with newline (no modification)
-        page_content = "\n".join(chunk_lines)
-        
-        # Validate that we can assign chunk_id (REQUIRED invariant)
-        if not source_id:
-            raise ValueError(
-                f"Cannot assign chunk_id: source_id is empty or None. "
-                f"source_name={source_name}"
-            )
-        if chunk_index is None:
-            raise ValueError(
-                f"Cannot assign chunk_id: chunk_index is None. "
-                f"source_name={source_name}"
-            )
-        
-        # Generate chunk_id
-        chunk_id = f"{source_id}:chunk:{chunk_index}"
-        
-        # Create Document with metadata
-        doc = Document(
-            page_content=page_content,
+    # Generate chunks with overlap: windows start every (chunk_size - chunk_overlap) lines
+    step = chunk_size - chunk_overlap
+    chunks = [
+        Document(
+            # Join lines with newline (no modification)
+            page_content="\n".join(lines[start:start + chunk_size]),
             metadata={
                 "source": source_name,
                 "document_type": document_type,
                 "source_id": source_id,
                 "chunk_index": chunk_index,
-                "chunk_id": chunk_id  # NEW - guaranteed to exist
+                "chunk_id": f"{source_id}:chunk:{chunk_index}"  # NEW - guaranteed to exist
             }
         )
-        chunks.append(doc)
-        
-        # Move to next chunk with overlap
-        chunk_index += 1
-        start += (chunk_size - chunk_overlap)
+        for chunk_index, start in enumerate(range(0, len(lines), step))
+    ]
     
     return chunks
 
 
-def load_csv_with_chunk_id(csv_path: str, source_id: str, metadata_columns: List[str]):
+def load_csv_with_chunk_id(
+    csv_path: str,
+    source_id: str,
+    metadata_columns: List[str],
+    intern_columns: Optional[List[str]] = None
+):
     """
     Load CSV documents with chunk_id generation.
     
@@ -166,6 +385,8 @@ def load_csv_with_chunk_id(csv_path: str, source_id: str, metadata_columns: List
         csv_path: Path to CSV file
         source_id: Identifier for this data source (e.g., "HINTS")
         metadata_columns: List of column names to extract as metadata
+        intern_columns: Low-cardinality metadata columns to intern
+            (see load_csv_documents)
         
     Returns:
         List of Document objects with chunk_id in metadata
@@ -178,7 +399,7 @@ def load_csv_with_chunk_id(csv_path: str, source_id: str, metadata_columns: List
         metadata_columns = ["question_id"] + metadata_columns
     
     # Load CSV
-    docs = load_csv_documents(csv_path, metadata_columns)
+    docs = load_csv_documents(csv_path, metadata_columns, intern_columns)
     
     # Get just the filename (not the full path) for consistency
     csv_filename = Path(csv_path).name
@@ -207,3 +428,37 @@ def load_csv_with_chunk_id(csv_path: str, source_id: str, metadata_columns: List
         doc.metadata["source_id"] = source_id
     
     return docs
+
+
+def write_collection_metadata(
+    client: QdrantClient,
+    collection_name: str,
+    metadata: dict
+):
+    """
+    Store build metadata on the server next to a collection.
+    
+    Metadata goes into a companion collection holding a single point
+    (id 0, 1-dim placeholder vector) whose payload is the metadata, so it
+    is discoverable by any client of the server without polluting search
+    results in the data collection. Any previous metadata is replaced.
+    Deployments that copy collection directories must copy the companion
+    too (see apps/retrieval/README.md, "Building Collections").
+    
+    Args:
+        client: Connected QdrantClient
+        collection_name: Name of the data collection
+        metadata: JSON-serializable metadata dict
+    """
+    meta_collection = f"{collection_name}{METADATA_COLLECTION_SUFFIX}"
+    if client.collection_exists(meta_collection):
+        client.delete_collection(meta_collection)
+    
+    client.create_collection(
+        collection_name=meta_collection,
+        vectors_config=VectorParams(size=1, distance=Distance.DOT)
+    )
+    client.upsert(
+        collection_name=meta_collection,
+        points=[PointStruct(id=0, vector=[1.0], payload=metadata)]
+    )
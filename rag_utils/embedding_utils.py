@@ -64,7 +64,9 @@ def create_cached_openai_embeddings(
 def get_embedding_function(
     provider: str,
     execution_mode: str,
-    model_name: Optional[str] = None
+    model_name: Optional[str] = None,
+    use_cache: bool = True,
+    encode_kwargs: Optional[dict] = None
 ):
     """
     Create embeddings with support for multiple providers.
@@ -80,6 +82,11 @@ def get_embedding_function(
             - "runtime" → treated as "backend"
             - "eval" → treated as "build"
         model_name: Model name (if None, uses provider default)
+        use_cache: For provider="openai", wrap embeddings in the on-disk
+            cache (default). Pass False for one-shot bulk jobs where
+            per-text cache files are pure overhead.
+        encode_kwargs: For provider="local", extra SentenceTransformer.encode()
+            arguments (e.g. {"batch_size": 64}) used by embed_documents.
         
     Returns:
         Configured embeddings object
@@ -113,6 +120,8 @@ def get_embedding_function(
     
     if provider == "openai":
         model_name = model_name or "text-embedding-3-small"
+        if not use_cache:
+            return OpenAIEmbeddings(model=model_name)
         # Cache directory is OpenAI implementation detail
         cache_dir = "./cache/embeddings"
         return create_cached_openai_embeddings(
@@ -140,7 +149,7 @@ def get_embedding_function(
                 "Note: This is only for retrieval-service and build scripts.\n"
                 "Production backend uses OpenAI embeddings."
             ) from e
-        return HuggingFaceEmbeddings(model_name=model_name)
+        return HuggingFaceEmbeddings(model_name=model_name, encode_kwargs=encode_kwargs or {})
         
     else:
         raise ValueError(f"Unknown provider: {provider}. Must be 'openai' or 'local'")
@@ -11,25 +11,61 @@ from typing import Optional, Dict, Any
 from qdrant_client import QdrantClient
 from langchain_community.vectorstores import Qdrant
 
+# Build metadata is stored in a one-point companion collection named
+# "<collection><METADATA_COLLECTION_SUFFIX>" so it never shows up in search
+METADATA_COLLECTION_SUFFIX = "__meta"
 
-def load_qdrant_client(qdrant_url: str) -> QdrantClient:
+
+def load_qdrant_client(
+    qdrant_url: str,
+    prefer_grpc: bool = False,
+    grpc_port: int = 6334
+) -> QdrantClient:
     """
     Load Qdrant client connected to server.
     
     Args:
         qdrant_url: Qdrant server URL (e.g., "http://localhost:6333")
+        prefer_grpc: Use gRPC (HTTP/2) instead of REST where supported
+        grpc_port: Server gRPC port (used when prefer_grpc is True)
         
     Returns:
         QdrantClient instance
     """
+    if prefer_grpc:
+        return QdrantClient(url=qdrant_url, prefer_grpc=True, grpc_port=grpc_port)
     return QdrantClient(url=qdrant_url)
 
 
+def read_collection_metadata(
+    client: QdrantClient,
+    collection_name: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Read build metadata stored alongside a collection.
+    
+    Args:
+        client: Connected QdrantClient
+        collection_name: Name of the data collection
+        
+    Returns:
+        Metadata dict, or None if the collection was built without it
+    """
+    meta_collection = f"{collection_name}{METADATA_COLLECTION_SUFFIX}"
+    if not client.collection_exists(meta_collection):
+        return None
+    
+    points = client.retrieve(meta_collection, ids=[0], with_payload=True)
+    return points[0].payload if points else None
+
+
 def load_retriever(
     qdrant_url: str,
     collection_name: str,
     embeddings,
-    search_kwargs: Optional[Dict[str, Any]] = None
+    search_kwargs: Optional[Dict[str, Any]] = None,
+    prefer_grpc: bool = False,
+    grpc_port: int = 6334
 ):
     """
     Load a retriever from an existing Qdrant collection.
@@ -39,6 +75,8 @@ def load_retriever(
         collection_name: Name of the collection to load
         embeddings: Embeddings function (for query embedding only)
         search_kwargs: Optional search parameters (e.g., {"k": 4})
+        prefer_grpc: Use gRPC (HTTP/2) instead of REST where supported
+        grpc_port: Server gRPC port (used when prefer_grpc is True)
         
     Returns:
         Retriever instance
@@ -47,7 +85,7 @@ def load_retriever(
         search_kwargs = {"k": 4}
     
     # Load client and verify collection exists
-    client = load_qdrant_client(qdrant_url)
+    client = load_qdrant_client(qdrant_url, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
     
     if not client.collection_exists(collection_name):
         raise RuntimeError(
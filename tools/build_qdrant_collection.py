@@ -19,13 +19,20 @@ Examples:
     
     # Force rebuild existing collection
     python tools/build_qdrant_collection.py --qdrant-url http://localhost:6333 --collection-name Thudbot_Hints --force
+    
+    # One-shot build without writing the embedding cache
+    python tools/build_qdrant_collection.py --qdrant-url http://localhost:6333 --collection-name Thudbot_Hints --no-embedding-cache
 """
 
 import sys
 import os
+import asyncio
 import warnings
 import logging
 import argparse
+import hashlib
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -43,16 +50,100 @@ warnings.filterwarnings("ignore")  # Suppress all warnings
 
 # Suppress all library logging except critical errors
 logging.basicConfig(level=logging.ERROR)
-logging.getLogger("langchain").setLevel(logging.ERROR)
-logging.getLogger("openai").setLevel(logging.ERROR)
-logging.getLogger("httpx").setLevel(logging.ERROR)
-logging.getLogger("httpcore").setLevel(logging.ERROR)
+for noisy_logger in ("langchain", "openai", "httpx", "httpcore"):
+    logging.getLogger(noisy_logger).setLevel(logging.ERROR)
+
+
+# Line-based chunking parameters for sequential text files
+CHUNK_SIZE = 10
+CHUNK_OVERLAP = 4
+
+# CSV columns kept as document metadata
+CSV_METADATA_COLUMNS = [
+    "question_id",  # Required for chunk_id generation
+    "question", "hint_level", "character", "speaker",
+    "narrative_context", "planet", "location", "category",
+    "puzzle_id", "response_must_mention", "response_must_not_mention"
+]
+
+# Metadata columns with few distinct values, interned while loading
+CSV_INTERN_COLUMNS = [
+    "hint_level", "character", "speaker", "planet",
+    "location", "category", "puzzle_id"
+]
+
+def default_docs_cache_dir() -> Path:
+    """Return the build document cache root (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "thudbot" / "docs"
 
-from qdrant_client import QdrantClient
 
-# Import from shared rag_utils
-from rag_utils.embedding_utils import get_embedding_function
-from rag_utils.build_utils import load_csv_documents, load_csv_with_chunk_id, upsert_documents_to_collection, chunk_text_by_lines
+# Parsed/chunked documents are cached here, keyed by a hash of their inputs.
+# Bump DOCS_CACHE_VERSION when loader or chunker output changes.
+DOCS_CACHE_DIR = default_docs_cache_dir()
+DOCS_CACHE_VERSION = "1"
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file as bytes."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_txt_sources(txt_dir) -> list[tuple[str, bytes]]:
+    """Read every .txt file in txt_dir once, returning (name, raw bytes) sorted by name."""
+    with os.scandir(txt_dir) as entries:
+        txt_entries = [
+            entry for entry in entries
+            if entry.name.endswith(".txt") and entry.is_file(follow_symlinks=False)
+        ]
+    txt_entries.sort(key=lambda entry: entry.name)
+    
+    # File reads release the GIL, so a small pool overlaps them; map keeps name order
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        contents = list(executor.map(_read_bytes, [entry.path for entry in txt_entries]))
+    return [(entry.name, raw_bytes) for entry, raw_bytes in zip(txt_entries, contents)]
+
+
+def compute_docs_cache_key(csv_path, txt_sources) -> str:
+    """Hash the source files and loader settings that determine the document list."""
+    h = hashlib.sha256()
+    h.update(f"v{DOCS_CACHE_VERSION}|{CHUNK_SIZE}|{CHUNK_OVERLAP}|{','.join(CSV_METADATA_COLUMNS)}".encode())
+    # The exact path string, since that is what load_csv_documents stores as
+    # source: a cached Document must never carry another spelling or copy
+    h.update(str(csv_path).encode())
+    h.update(Path(csv_path).read_bytes())
+    for name, raw_bytes in txt_sources:
+        h.update(name.encode())
+        h.update(raw_bytes)
+    return h.hexdigest()
+
+
+def load_cached_docs(cache_file: Path):
+    """
+    Return cached (hint_data, sequential_docs), or None on a miss.
+    
+    An unreadable entry (truncated write, or a Document pickle from another
+    LangChain version) is deleted and treated as a miss so the build
+    simply re-parses the sources.
+    """
+    if not cache_file.exists():
+        return None
+    try:
+        hint_data, sequential_docs = pickle.loads(cache_file.read_bytes())
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable document cache {cache_file.name} ({type(e).__name__}); rebuilding")
+        cache_file.unlink(missing_ok=True)
+        return None
+    return hint_data, sequential_docs
+
+
+def save_cached_docs(cache_file: Path, hint_data, sequential_docs):
+    """Write a cache entry atomically (temp file + os.replace), so readers never see a partial pickle."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_bytes(pickle.dumps((hint_data, sequential_docs)))
+    os.replace(tmp_file, cache_file)
 
 
 def get_default_model_for_provider(provider: str) -> str:
@@ -65,15 +156,26 @@ def get_default_model_for_provider(provider: str) -> str:
         raise ValueError(f"Unknown provider: {provider}")
 
 
+_env_loaded = False
+
+
 def load_dotenv_from_path():
-    """Load the nearest .env file by walking up the directory tree."""
-    current_path = Path(__file__).resolve()
-    for parent in [current_path] + list(current_path.parents):
-        env_path = parent / ".env"
-        if env_path.exists():
+    """Load the nearest .env file by walking up the directory tree (once per process)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    
+    path = script_dir
+    while True:
+        env_path = path / ".env"
+        if env_path.is_file():
             load_dotenv(dotenv_path=env_path, override=True)
             return
-    # Silently continue if no .env found - may be using environment variables
+        if path.parent == path:
+            # Silently continue if no .env found - may be using environment variables
+            return
+        path = path.parent
 
 
 def main():
@@ -118,6 +220,17 @@ Examples:
         required=True,
         help="Qdrant server URL (e.g., http://localhost:6333) - REQUIRED"
     )
+    parser.add_argument(
+        "--grpc-port",
+        type=int,
+        default=6334,
+        help="Qdrant gRPC port used for the bulk upload (default: 6334)"
+    )
+    parser.add_argument(
+        "--no-grpc",
+        action="store_true",
+        help="Use REST on --qdrant-url only, for servers that don't expose the gRPC port"
+    )
     parser.add_argument(
         "--collection-name",
         required=True,
@@ -140,8 +253,32 @@ Examples:
         help="Override default embedding model. If not specified, uses provider default: "
              "OpenAI='text-embedding-3-small', Local='BAAI/bge-small-en-v1.5'"
     )
+    parser.add_argument(
+        "--on-disk",
+        action="store_true",
+        help="Keep vectors and the HNSW index on disk instead of in RAM (default: in RAM)"
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=["none", "scalar"],
+        default="none",
+        help="'scalar' keeps an int8 quantized copy of the vectors in RAM for search; "
+             "changes scores slightly, so evaluate with TEF --quantization scalar (default: none)"
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Skip the on-disk OpenAI embedding cache (./cache/embeddings). Useful for "
+             "one-shot builds, where writing one cache file per text is wasted I/O"
+    )
     
     args = parser.parse_args()
+    
+    # Heavy imports are deferred: qdrant_client until arguments are parsed (so
+    # --help and usage errors return immediately), LangChain-backed rag_utils
+    # until the collection checks below have passed
+    from qdrant_client import QdrantClient
+    
     csv_path = args.csv_path
     txt_dir = args.txt_dir
     qdrant_url = args.qdrant_url
@@ -158,13 +295,22 @@ Examples:
     # Connect to Qdrant server and check collection existence
     print(f"🌐 Connecting to Qdrant server at {qdrant_url}...")
     try:
-        client = QdrantClient(url=qdrant_url)
+        # gRPC (unless --no-grpc) for the bulk upload; this one client is
+        # reused for the whole build
+        client = QdrantClient(
+            url=qdrant_url,
+            prefer_grpc=not args.no_grpc,
+            grpc_port=args.grpc_port,
+            timeout=300
+        )
         # Test connection
         client.get_collections()
         print(f"✅ Connected to Qdrant server")
     except Exception as e:
         print(f"❌ Error: Cannot connect to Qdrant server at {qdrant_url}")
         print(f"   Make sure Qdrant is running: docker compose up -d qdrant")
+        if not args.no_grpc:
+            print(f"   If only the REST port is exposed, rerun with --no-grpc (or set --grpc-port)")
         print(f"   Error details: {e}")
         return
     
@@ -182,34 +328,52 @@ Examples:
     else:
         print(f"✅ Collection '{collection_name}' does not exist. Proceeding with creation.")
     
-    # Load CSV using rag_utils with chunk_id generation
-    hint_data = load_csv_with_chunk_id(
-        csv_path=csv_path,
-        source_id="HINTS",
-        metadata_columns=[
-            "question_id",  # Required for chunk_id generation
-            "question", "hint_level", "character", "speaker",
-            "narrative_context", "planet", "location", "category",
-            "puzzle_id", "response_must_mention", "response_must_not_mention"
-        ]
+    from rag_utils.embedding_utils import get_embedding_function
+    from rag_utils.build_utils import (
+        load_csv_with_chunk_id,
+        upsert_documents_to_collection,
+        chunk_text_by_lines,
+        aembed_documents_in_batches,
+        write_collection_metadata,
     )
-    print(f"✅ Loaded {len(hint_data)} CSV documents")
     
-    # Load and chunk sequential text files if txt_dir provided
-    sequential_docs = []
+    # Collect sequential text files if txt_dir provided
+    txt_sources = []
     if txt_dir:
-        txt_path = Path(txt_dir)
-        if not txt_path.exists():
+        if not Path(txt_dir).exists():
             print(f"⚠️  Warning: Text directory not found: {txt_dir}")
         else:
-            for file in txt_path.glob("*.txt"):
-                raw_text = file.read_text(encoding="utf-8", errors="ignore")
-                docs = chunk_text_by_lines(raw_text, file.name)
-                sequential_docs.extend(docs)
-                print(f"✅ Loaded {file.name}: {len(docs)} chunks")
-            
-            if sequential_docs:
-                print(f"✅ Total sequential text chunks: {len(sequential_docs)}")
+            txt_sources = read_txt_sources(txt_dir)
+    
+    # Reuse previously parsed/chunked documents when no input has changed
+    cache_file = DOCS_CACHE_DIR / f"docs_{compute_docs_cache_key(csv_path, txt_sources)}.pkl"
+    cached = load_cached_docs(cache_file)
+    if cached is not None:
+        hint_data, sequential_docs = cached
+        print(f"✅ Loaded {len(hint_data)} CSV documents and "
+              f"{len(sequential_docs)} text chunks from cache ({cache_file.name})")
+    else:
+        # Load CSV using rag_utils with chunk_id generation
+        hint_data = load_csv_with_chunk_id(
+            csv_path=csv_path,
+            source_id="HINTS",
+            metadata_columns=CSV_METADATA_COLUMNS,
+            intern_columns=CSV_INTERN_COLUMNS
+        )
+        print(f"✅ Loaded {len(hint_data)} CSV documents")
+        
+        # Load and chunk sequential text files
+        sequential_docs = []
+        for name, raw_bytes in txt_sources:
+            raw_text = raw_bytes.decode("utf-8", errors="ignore")
+            docs = chunk_text_by_lines(raw_text, name, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+            sequential_docs.extend(docs)
+            print(f"✅ Loaded {name}: {len(docs)} chunks")
+        
+        if sequential_docs:
+            print(f"✅ Total sequential text chunks: {len(sequential_docs)}")
+        
+        save_cached_docs(cache_file, hint_data, sequential_docs)
     
     # Merge all documents
     all_docs = hint_data + sequential_docs
@@ -224,7 +388,22 @@ Examples:
     embeddings = get_embedding_function(
         provider=args.embedding_provider,
         execution_mode="build",  # Build scripts are evaluation/development
-        model_name=actual_model if args.embedding_model else None
+        model_name=actual_model if args.embedding_model else None,
+        use_cache=not args.no_embedding_cache
+    )
+    
+    # Embed all documents up front with batched requests. OpenAI calls are
+    # network-bound and run concurrently; the local model is CPU-bound and
+    # already spreads each batch across all cores via torch, so its batches
+    # run one at a time to avoid oversubscribing the CPU.
+    print(f"🧮 Embedding {len(all_docs)} documents...")
+    concurrency = 1 if args.embedding_provider == "local" else 10
+    vectors = asyncio.run(
+        aembed_documents_in_batches(
+            embeddings,
+            [doc.page_content for doc in all_docs],
+            concurrency=concurrency
+        )
     )
     
     # Create persistent vectorstore using rag_utils (server mode)
@@ -233,11 +412,14 @@ Examples:
         qdrant_url=qdrant_url,
         collection_name=collection_name,
         documents=all_docs,
-        embeddings=embeddings
+        embeddings=embeddings,
+        vectors=vectors,
+        client=client,
+        on_disk=args.on_disk,
+        quantization=args.quantization
     )
     
-    # Store collection metadata in payload for retrieval later
-    import json
+    # Store collection metadata on the server for retrieval later
     from datetime import datetime
     
     metadata = {
@@ -247,12 +429,16 @@ Examples:
         "embedding_provider": args.embedding_provider,
         "embedding_model": actual_model,
         "chunk_strategy": "line_based",
-        "chunk_size": 10,
-        "chunk_overlap": 4,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "on_disk": args.on_disk,
+        "quantization": args.quantization,
         "collection_name": collection_name,
         "created_at": datetime.utcnow().isoformat() + "Z"
     }
     
+    write_collection_metadata(client, collection_name, metadata)
+    
     print(f"✅ Collection metadata:")
     for key, value in metadata.items():
         print(f"   {key}: {value}")
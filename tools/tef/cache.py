@@ -0,0 +1,53 @@
+"""
+TEF Embedding Cache
+
+On-disk cache of question embeddings so repeat runs skip the embedding
+provider for unchanged questions.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+
+def default_cache_dir() -> Path:
+    """Return the TEF embedding cache root (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "tef" / "embeddings"
+
+
+class EmbeddingCache:
+    """
+    One .npy file per (model, question) under <root>/<provider>/<model>/.
+    
+    Keys are sha256(question), so switching models or providers never
+    returns a vector from a different embedding space.
+    """
+    
+    def __init__(self, root: Path, provider: str, model: str):
+        self.dir = Path(root) / provider / model.replace("/", "__")
+    
+    def _path(self, question: str) -> Path:
+        return self.dir / f"{hashlib.sha256(question.encode('utf-8')).hexdigest()}.npy"
+    
+    def get(self, question: str) -> Optional[np.ndarray]:
+        """Return the cached vector, or None on a miss (or unreadable file)."""
+        try:
+            return np.load(self._path(question), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+    
+    def get_many(self, questions: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up all questions in one pass."""
+        return [self.get(q) for q in questions]
+    
+    def put(self, question: str, vector) -> None:
+        """Store a vector (written to a temp file, then renamed into place)."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(question)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(vector, dtype=np.float32))
+        os.replace(tmp_path, path)
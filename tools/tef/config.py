@@ -7,6 +7,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional
 
+from tools.tef.cache import default_cache_dir
+
 
 # Calculate project root from this file's location
 # config.py is at tools/tef/config.py, so parents[2] gives us project root
@@ -30,6 +32,7 @@ class TEFConfig:
     """
     # Qdrant connection
     qdrant_url: str = "http://localhost:6333"
+    grpc_port: int = 6334  # Searches go over gRPC
     collection_name: str = "Thudbot_Hints"
     benchmark_path: str = str(PROJECT_ROOT / "tools/tef/benchmark/benchmark_tef.csv")
     
@@ -37,9 +40,18 @@ class TEFConfig:
     # CRITICAL: Must match the collection's embedding configuration
     embedding_provider: str = "openai"  # "openai" or "local"
     embedding_model: Optional[str] = None  # Override default (if None, uses provider default)
+    embedding_cache: bool = True  # Reuse question embeddings across runs
+    embedding_cache_dir: str = str(default_cache_dir())
     
     # Retrieval parameters
     k_values: List[int] = field(default_factory=lambda: [1, 3, 5, 10])
+    batch_search: bool = False  # Opt-in: one batched request; no per-question search_ms
+    max_concurrency: int = 8  # In-flight searches when batch_search is False
+    
+    # Quantized search (must match how the collection was built)
+    quantization: str = "none"  # "none" (server default), "scalar" or "binary"
+    oversampling: float = 2.0  # Candidates fetched from the quantized index = k * oversampling
+    rescore: bool = True  # Re-rank candidates with full-precision vectors
     
     # Output
     output_dir: str = str(PROJECT_ROOT / "tools/tef/results")
@@ -57,4 +69,16 @@ class TEFConfig:
         
         if any(k <= 0 for k in self.k_values):
             raise ValueError("All k_values must be positive integers")
+        
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        if self.quantization not in ["none", "scalar", "binary"]:
+            raise ValueError(
+                f"Invalid quantization: {self.quantization}. "
+                f"Must be 'none', 'scalar' or 'binary'"
+            )
+        
+        if self.oversampling < 1.0:
+            raise ValueError("oversampling must be at least 1.0")
 
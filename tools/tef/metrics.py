@@ -3,17 +3,23 @@ TEF Metrics Computation
 
 Recall@k and latency statistics for retrieval evaluation.
 """
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional
 import statistics
 
+import numpy as np
+
+
+# Hit rank for results with no expected chunk among the retrieved ones
+NO_HIT = 10**9
+
 
 class QuestionResult:
     """
     Result for a single evaluation question.
     
     Note: embed_ms is kept for schema compatibility but set to 0.0.
-    search_ms includes the full retrieval cost (embedding + vector search).
-    total_ms = embed_ms + search_ms = search_ms (since embed_ms = 0.0).
+    Questions are embedded in one batch up front, so search_ms is the
+    vector search only; total_ms = embed_ms + search_ms = search_ms.
     """
     
     def __init__(
@@ -36,6 +42,14 @@ class QuestionResult:
         self.search_ms = search_ms
         self.total_ms = embed_ms + search_ms
         self.error = error
+        
+        # Results are immutable once built, so hit@k reduces to comparing
+        # against the rank of the first expected chunk (NO_HIT if none)
+        self._expected = {c for c in (expected_primary, expected_secondary) if c}
+        self._hit_rank = next(
+            (i for i, c in enumerate(retrieved_chunks) if c in self._expected),
+            NO_HIT
+        )
     
     def is_hit_at_k(self, k: int) -> bool:
         """
@@ -44,25 +58,54 @@ class QuestionResult:
         A hit occurs if either expected_primary OR expected_secondary
         appears in the top-k retrieved chunks.
         """
-        if self.error:
-            return False
+        return not self.error and self._hit_rank < k
+    
+    @staticmethod
+    def make_row_builder(k_values: List[int], num_retrieved: int = 10) -> Callable[["QuestionResult"], List[Any]]:
+        """
+        Build a CSV row function specialized for one run's k values.
         
-        top_k = self.retrieved_chunks[:k]
+        The row shape is fixed for a whole run, so sorting k_values and
+        padding widths are resolved once here instead of per row. Column
+        order matches to_dict().
         
-        # Check primary expected chunk
-        if self.expected_primary and self.expected_primary in top_k:
-            return True
+        Args:
+            k_values: List of k values for which to emit hit@k
+            num_retrieved: Number of retrieved_N columns
+            
+        Returns:
+            Function mapping a QuestionResult to a list of cell values
+        """
+        ks = sorted(set(k_values))
+        misses = [0] * len(ks)
+        padding = [""] * num_retrieved
         
-        # Check secondary expected chunk (if present)
-        if self.expected_secondary and self.expected_secondary in top_k:
-            return True
+        def row(r: "QuestionResult") -> List[Any]:
+            rank = r._hit_rank
+            hits = misses if r.error else [1 if rank < k else 0 for k in ks]
+            chunks = r.retrieved_chunks[:num_retrieved]
+            return [
+                r.qid,
+                r.question,
+                r.expected_primary,
+                r.expected_secondary or "",
+                f"{r.embed_ms:.2f}",
+                f"{r.search_ms:.2f}",
+                f"{r.total_ms:.2f}",
+                *hits,
+                *chunks,
+                *padding[len(chunks):],
+                r.error or "",
+            ]
         
-        return False
+        return row
     
     def to_dict(self, k_values: List[int]) -> Dict[str, Any]:
         """
         Convert to dictionary for CSV export.
         
+        Latencies are left unrounded; formatting happens at write time.
+        
         Args:
             k_values: List of k values for which to compute hit@k
             
@@ -74,9 +117,9 @@ class QuestionResult:
             "question": self.question,
             "expected_primary": self.expected_primary,
             "expected_secondary": self.expected_secondary or "",
-            "embed_ms": round(self.embed_ms, 2),
-            "search_ms": round(self.search_ms, 2),
-            "total_ms": round(self.total_ms, 2),
+            "embed_ms": self.embed_ms,
+            "search_ms": self.search_ms,
+            "total_ms": self.total_ms,
         }
         
         # Compute hit@k on demand (stateless - single source of truth)
@@ -96,6 +139,41 @@ class QuestionResult:
         return result
 
 
+def _build_hit_matrix(results: List[QuestionResult], max_k: int) -> np.ndarray:
+    """
+    Build a boolean [len(results), max_k] matrix of expected-chunk matches.
+    
+    hits[i, j] is True when results[i].retrieved_chunks[j] is the expected
+    primary or secondary chunk. Rows for errored questions are all False.
+    """
+    hits = np.zeros((len(results), max_k), dtype=bool)
+    for i, r in enumerate(results):
+        if r.error:
+            continue
+        for j, chunk_id in enumerate(r.retrieved_chunks[:max_k]):
+            if chunk_id in r._expected:
+                hits[i, j] = True
+    return hits
+
+
+def compute_all_recalls(results: List[QuestionResult], k_values: List[int]) -> Dict[int, float]:
+    """
+    Compute recall@k for every k from a single pass over the results.
+    
+    Args:
+        results: List of QuestionResult objects
+        k_values: The k values for top-k retrieval
+        
+    Returns:
+        Dict mapping k to recall@k (float between 0.0 and 1.0)
+    """
+    if not results:
+        return {k: 0.0 for k in k_values}
+    
+    hits = _build_hit_matrix(results, max(k_values))
+    return {k: float(hits[:, :k].any(axis=1).mean()) for k in k_values}
+
+
 def compute_recall_at_k(results: List[QuestionResult], k: int) -> float:
     """
     Compute recall@k across all questions.
@@ -111,11 +189,7 @@ def compute_recall_at_k(results: List[QuestionResult], k: int) -> float:
     Returns:
         Recall@k as a float between 0.0 and 1.0
     """
-    if not results:
-        return 0.0
-    
-    hits = sum(1 for r in results if r.is_hit_at_k(k))
-    return hits / len(results)
+    return compute_all_recalls(results, [k])[k]
 
 
 def compute_latency_stats(results: List[QuestionResult]) -> Dict[str, float]:
@@ -123,8 +197,8 @@ def compute_latency_stats(results: List[QuestionResult]) -> Dict[str, float]:
     Compute latency statistics across all questions.
     
     Computes p50, p95, p99 for:
-    - embed_ms: Always 0.0 (embedding included in search_ms)
-    - search_ms: Full retrieval time (embedding + vector search)
+    - embed_ms: Always 0.0 (embedding is batched, see embed_batch_ms)
+    - search_ms: Vector search time
     - total_ms: Same as search_ms (since embed_ms = 0.0)
     
     Note: embed_ms stats are kept for schema compatibility but will be 0.
@@ -153,31 +227,33 @@ def compute_latency_stats(results: List[QuestionResult]) -> Dict[str, float]:
             "total_ms_p99": 0.0,
         }
     
-    embed_times = [r.embed_ms for r in valid_results]
     search_times = [r.search_ms for r in valid_results]
     total_times = [r.total_ms for r in valid_results]
     
-    def percentile(data: List[float], p: float) -> float:
+    def percentiles(data: List[float]) -> List[float]:
         """
-        Compute percentile using linear interpolation.
+        p50, p95, p99 from one statistics.quantiles() call.
         
-        Uses statistics.quantiles() which provides smooth percentile estimates
-        via linear interpolation between data points.
+        Same estimator as earlier runs: (n+1)-based linear interpolation,
+        which extrapolates past the largest sample for small n at the tails.
         """
-        if not data:
-            return 0.0
-        sorted_data = sorted(data)
-        return statistics.quantiles(sorted_data, n=100)[int(p) - 1] if len(sorted_data) > 1 else sorted_data[0]
+        if len(data) == 1:
+            return [data[0]] * 3
+        cuts = statistics.quantiles(data, n=100)
+        return [cuts[49], cuts[94], cuts[98]]
+    
+    search_p50, search_p95, search_p99 = (round(v, 2) for v in percentiles(search_times))
+    total_p50, total_p95, total_p99 = (round(v, 2) for v in percentiles(total_times))
     
     return {
-        "embed_ms_p50": round(percentile(embed_times, 50), 2),
-        "embed_ms_p95": round(percentile(embed_times, 95), 2),
-        "embed_ms_p99": round(percentile(embed_times, 99), 2),
-        "search_ms_p50": round(percentile(search_times, 50), 2),
-        "search_ms_p95": round(percentile(search_times, 95), 2),
-        "search_ms_p99": round(percentile(search_times, 99), 2),
-        "total_ms_p50": round(percentile(total_times, 50), 2),
-        "total_ms_p95": round(percentile(total_times, 95), 2),
-        "total_ms_p99": round(percentile(total_times, 99), 2),
+        # embed_ms is always 0.0 (embedding is batched, see embed_batch_ms)
+        "embed_ms_p50": 0.0,
+        "embed_ms_p95": 0.0,
+        "embed_ms_p99": 0.0,
+        "search_ms_p50": float(search_p50),
+        "search_ms_p95": float(search_p95),
+        "search_ms_p99": float(search_p99),
+        "total_ms_p50": float(total_p50),
+        "total_ms_p95": float(total_p95),
+        "total_ms_p99": float(total_p99),
     }
-
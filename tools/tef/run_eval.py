@@ -14,16 +14,24 @@ import json
 import csv
 import argparse
 from pathlib import Path
-from datetime import datetime
+from typing import Dict, Optional
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:
+    # Optional - stdlib json produces the same summary.json, just slower
+    orjson = None
 
 # Add project root to path (needed before we can import from tools/)
 script_dir = Path(__file__).resolve().parent
 PROJECT_ROOT = script_dir.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from tools.tef.cache import default_cache_dir
 from tools.tef.config import TEFConfig
 from tools.tef.evaluator import TEFEvaluator
-from tools.tef.metrics import compute_recall_at_k, compute_latency_stats
+from tools.tef.metrics import QuestionResult, compute_all_recalls, compute_latency_stats
 
 
 def parse_args():
@@ -56,6 +64,13 @@ Examples:
         help='Qdrant server URL (default: http://localhost:6333)'
     )
     
+    parser.add_argument(
+        '--grpc-port',
+        type=int,
+        default=6334,
+        help='Qdrant gRPC port used for searches (default: 6334)'
+    )
+    
     parser.add_argument(
         '--collection',
         default='Thudbot_Hints',
@@ -80,6 +95,18 @@ Examples:
         help='Override default embedding model'
     )
     
+    parser.add_argument(
+        '--no-embedding-cache',
+        action='store_true',
+        help='Re-embed every question instead of using the on-disk question cache'
+    )
+    
+    parser.add_argument(
+        '--embedding-cache-dir',
+        default=str(default_cache_dir()),
+        help='Question embedding cache directory (default: $XDG_CACHE_HOME/tef/embeddings)'
+    )
+    
     parser.add_argument(
         '--output-dir',
         default=str(PROJECT_ROOT / "tools/tef/results"),
@@ -94,6 +121,40 @@ Examples:
         help='K values for recall@k (default: 1 3 5 10)'
     )
     
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Search all questions in one batched request; reports the batch wall time '
+             'instead of per-question search percentiles (default: one request per question)'
+    )
+    
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=8,
+        help='Maximum in-flight searches without --batch (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--quantization',
+        choices=['none', 'scalar', 'binary'],
+        default='none',
+        help='Search the quantized index; must match the collection (default: none, server default)'
+    )
+    
+    parser.add_argument(
+        '--oversampling',
+        type=float,
+        default=2.0,
+        help='Quantized search oversampling factor (default: 2.0)'
+    )
+    
+    parser.add_argument(
+        '--no-rescore',
+        action='store_true',
+        help='Skip full-precision rescoring of quantized candidates'
+    )
+    
     return parser.parse_args()
 
 
@@ -101,7 +162,12 @@ def save_results(
     results,
     config: TEFConfig,
     collection_metadata: dict,
-    output_dir: str
+    output_dir: str,
+    embed_batch_ms: float = 0.0,
+    cache_hits: int = 0,
+    recall: Optional[Dict[int, float]] = None,
+    latency: Optional[Dict[str, float]] = None,
+    search_batch_ms: Optional[float] = None
 ):
     """
     Save evaluation results to CSV and JSON.
@@ -115,9 +181,17 @@ def save_results(
         config: TEFConfig instance
         collection_metadata: Collection metadata dict
         output_dir: Output directory path
+        embed_batch_ms: Time spent embedding all questions in one batch
+        cache_hits: Questions answered from the repeated-question cache
+        recall: Precomputed recall@k by k (computed here if None)
+        latency: Precomputed latency stats (computed here if None)
+        search_batch_ms: Wall time of the single batched search (--batch only)
     """
+    # One clock read for both the directory name and the summary timestamp
+    now = datetime.now(timezone.utc)
+    
     # Create timestamped output directory
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
+    timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
     run_dir = Path(output_dir) / timestamp
     run_dir.mkdir(parents=True, exist_ok=True)
     
@@ -127,20 +201,27 @@ def save_results(
     per_question_path = run_dir / "per_question.csv"
     with open(per_question_path, 'w', newline='') as f:
         if results:
+            # Header comes from one representative row; data rows are plain
+            # lists in the same column order (no dict per row)
             fieldnames = list(results[0].to_dict(config.k_values).keys())
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for result in results:
-                writer.writerow(result.to_dict(config.k_values))
+            row_values = QuestionResult.make_row_builder(config.k_values)
+            
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(row_values(r) for r in results)
     
     print(f"  ✅ Saved per-question results: {per_question_path.name}")
     
     # Compute aggregate metrics
-    recall_metrics = {}
-    for k in config.k_values:
-        recall_metrics[f"recall@{k}"] = round(compute_recall_at_k(results, k), 4)
+    if recall is None:
+        recall = compute_all_recalls(results, config.k_values)
+    recall_metrics = {f"recall@{k}": round(value, 4) for k, value in recall.items()}
     
-    latency_metrics = compute_latency_stats(results)
+    # Batched runs have no per-question search timings to take percentiles of
+    if config.batch_search:
+        latency_metrics = {}
+    else:
+        latency_metrics = latency if latency is not None else compute_latency_stats(results)
     
     # Count errors
     error_count = sum(1 for r in results if r.error)
@@ -149,53 +230,84 @@ def save_results(
     summary = {
         "config": {
             "qdrant_url": config.qdrant_url,
+            "grpc_port": config.grpc_port,
             "collection_name": config.collection_name,
             "embedding_provider": config.embedding_provider,
             "embedding_model": config.embedding_model or collection_metadata["embedding_model"],
             "k_values": config.k_values,
+            "batch_search": config.batch_search,
+            "max_concurrency": config.max_concurrency,
+            "quantization": config.quantization,
+            "oversampling": config.oversampling,
+            "rescore": config.rescore,
             "benchmark_path": config.benchmark_path,
         },
         "collection_metadata": collection_metadata,
         "recall": recall_metrics,
         "latency": latency_metrics,
+        "embed_batch_ms": round(embed_batch_ms, 2),
+        "search_batch_ms": round(search_batch_ms, 2) if search_batch_ms is not None else None,
+        "query_cache_hits": cache_hits,
         "total_questions": len(results),
         "error_count": error_count,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
+        "timestamp": now.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     }
     
     # Save summary to JSON
     summary_path = run_dir / "summary.json"
-    with open(summary_path, 'w') as f:
-        json.dump(summary, f, indent=2)
+    if orjson is not None:
+        with open(summary_path, 'wb') as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
     
     print(f"  ✅ Saved summary: {summary_path.name}\n")
     
     return run_dir
 
 
-def print_summary(results, config: TEFConfig):
+def print_summary(
+    results,
+    config: TEFConfig,
+    embed_batch_ms: float = 0.0,
+    recall: Optional[Dict[int, float]] = None,
+    latency: Optional[Dict[str, float]] = None,
+    search_batch_ms: Optional[float] = None
+):
     """
     Print summary to console.
     
     Args:
         results: List of QuestionResult objects
         config: TEFConfig instance
+        embed_batch_ms: Time spent embedding all questions in one batch
+        recall: Precomputed recall@k by k (computed here if None)
+        latency: Precomputed latency stats (computed here if None)
+        search_batch_ms: Wall time of the single batched search (--batch only)
     """
+    if recall is None:
+        recall = compute_all_recalls(results, config.k_values)
+    if latency is None and not config.batch_search:
+        latency = compute_latency_stats(results)
+    
     print("=" * 60)
     print("📊 EVALUATION SUMMARY")
     print("=" * 60)
     
     # Recall metrics
     print("\n🎯 Recall@k:")
-    for k in config.k_values:
-        recall = compute_recall_at_k(results, k)
-        print(f"  recall@{k:2d}: {recall:.2%}")
+    for k, value in recall.items():
+        print(f"  recall@{k:2d}: {value:.2%}")
     
     # Latency metrics
-    latency = compute_latency_stats(results)
     print("\n⏱️  Latency (ms):")
-    print(f"  retrieval - p50: {latency['search_ms_p50']:6.1f}  p95: {latency['search_ms_p95']:6.1f}  p99: {latency['search_ms_p99']:6.1f}")
-    print("  (includes embedding + vector search)")
+    if config.batch_search:
+        batch_ms = search_batch_ms if search_batch_ms is not None else 0.0
+        print(f"  search    - {batch_ms:.1f} total for {len(results)} questions (one batch; no per-question percentiles)")
+    else:
+        print(f"  search    - p50: {latency['search_ms_p50']:6.1f}  p95: {latency['search_ms_p95']:6.1f}  p99: {latency['search_ms_p99']:6.1f}")
+    print(f"  embedding - {embed_batch_ms:.1f} total for {len(results)} questions (one batch)")
     
     # Error summary
     error_count = sum(1 for r in results if r.error)
@@ -212,11 +324,19 @@ def main():
     # Build configuration from CLI args
     config = TEFConfig(
         qdrant_url=args.qdrant_url,
+        grpc_port=args.grpc_port,
         collection_name=args.collection,
         benchmark_path=args.benchmark,
         embedding_provider=args.embedding_provider,
         embedding_model=args.embedding_model,
+        embedding_cache=not args.no_embedding_cache,
+        embedding_cache_dir=args.embedding_cache_dir,
         k_values=args.k_values,
+        batch_search=args.batch,
+        max_concurrency=args.max_concurrency,
+        quantization=args.quantization,
+        oversampling=args.oversampling,
+        rescore=not args.no_rescore,
         output_dir=args.output_dir
     )
     
@@ -232,15 +352,24 @@ def main():
         # Run evaluation
         results = evaluator.evaluate()
         
+        # Aggregate metrics once; shared by the console summary and summary.json
+        recall = compute_all_recalls(results, config.k_values)
+        latency = None if config.batch_search else compute_latency_stats(results)
+        
         # Print summary to console
-        print_summary(results, config)
+        print_summary(results, config, evaluator.embed_batch_ms, recall, latency, evaluator.search_batch_ms)
         
         # Save results to disk
         run_dir = save_results(
             results,
             config,
             evaluator.collection_metadata,
-            args.output_dir
+            args.output_dir,
+            evaluator.embed_batch_ms,
+            evaluator.cache_hits,
+            recall,
+            latency,
+            evaluator.search_batch_ms
         )
         
         print(f"✅ Evaluation complete! Results saved to:")
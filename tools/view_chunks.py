@@ -9,13 +9,29 @@ Usage:
     python tools/view_chunks.py --qdrant-url http://localhost:6333
     python tools/view_chunks.py --qdrant-url http://localhost:6333 --output ./my_chunks.csv
     python tools/view_chunks.py --qdrant-url http://localhost:6333 --include-full-content
+    python tools/view_chunks.py --qdrant-url http://localhost:6333 --format parquet
+    python tools/view_chunks.py --qdrant-url http://localhost:6333 --collections A,B
+    python tools/view_chunks.py --qdrant-url http://localhost:6333 --compress zstd
+    python tools/view_chunks.py --qdrant-url http://localhost:6333 --full-content-sidecar
 """
 
 import sys
 import argparse
+import asyncio
 import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 # Add project root to Python path
 script_dir = Path(__file__).resolve().parent
@@ -23,6 +39,46 @@ project_root = script_dir.parent
 sys.path.insert(0, str(project_root))
 
 from qdrant_client import QdrantClient
+from qdrant_client.http.models import PayloadSelectorInclude
+
+# Runs of whitespace collapsed to one space in previews
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Points per scroll request; each request has fixed round-trip overhead
+SCROLL_BATCH_SIZE = 1000
+
+# Output file buffer size (bytes)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Scrolled batches buffered ahead of the CSV writer
+SCROLL_QUEUE_SIZE = 4
+
+# Request timeout (seconds); large scroll pages can exceed the client default
+QDRANT_TIMEOUT_S = 60
+
+# Qdrant's default gRPC port
+QDRANT_GRPC_PORT = 6334
+
+# File suffix appended for each --compress codec
+COMPRESSION_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+# Encoded batches pending in the pool before the writer waits on the oldest
+MAX_IN_FLIGHT_BATCHES = 4
+
+# How often a blocked producer re-checks whether the consumer stopped (seconds)
+QUEUE_PUT_TIMEOUT_S = 0.5
+
+# Minimum seconds between progress lines
+PROGRESS_INTERVAL_S = 0.5
+
+# Shared read-only stand-in for a missing payload/metadata dict
+_EMPTY: Dict[str, Any] = {}
+
+# End-of-scroll marker put on the batch queue
+_SCROLL_DONE = object()
+
+# Payload fields every export reads; everything else in the payload is skipped
+EXPORT_PAYLOAD_KEYS = ["metadata.chunk_id", "metadata.source", "metadata.document_type", "page_content"]
 
 
 def truncate_text(text: str, max_length: int = 100) -> str:
@@ -30,34 +86,350 @@ def truncate_text(text: str, max_length: int = 100) -> str:
     Truncate text to max_length, adding ellipsis if truncated.
     Also replaces newlines with spaces for CSV readability.
     """
-    # Replace newlines and multiple spaces with single space
-    text = " ".join(text.split())
+    # Collapse whitespace in a bounded prefix only; the preview never
+    # needs more than the first max_length visible characters
+    head = _WHITESPACE_RE.sub(" ", text[:max_length * 4]).strip()
     
+    if len(head) > max_length:
+        return head[:max_length] + "..."
+    if len(text) <= max_length * 4:
+        return head
+    
+    # Prefix was mostly whitespace - fall back to the whole text
+    text = " ".join(text.split())
     if len(text) <= max_length:
         return text
     return text[:max_length] + "..."
 
 
+def _import_pyarrow():
+    """Import pyarrow for Parquet export, with an install hint if missing."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(
+            "Parquet export requires pyarrow.\n"
+            "Install with: pip install pyarrow"
+        ) from e
+    return pa, pq
+
+
+def _import_zstandard():
+    """Import zstandard for compressed CSV export, with an install hint if missing."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(
+            "zstd compression requires zstandard.\n"
+            "Install with: pip install zstandard"
+        ) from e
+    return zstandard
+
+
+@contextmanager
+def _open_text_output(output_file: Path, write_buffer_size: int, compress: str) -> Iterator[io.TextIOBase]:
+    """
+    Open a text output stream, optionally compressing it on the fly.
+    
+    zstd runs at level 3 using all cores, far faster than disk writes,
+    so compression cuts I/O without becoming the bottleneck.
+    """
+    if compress == "none":
+        # Large buffer: far fewer write() syscalls than the default 8 KiB
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=write_buffer_size) as f:
+            yield f
+        return
+    
+    with ExitStack() as stack:
+        raw = stack.enter_context(open(output_file, 'wb', buffering=write_buffer_size))
+        if compress == "zstd":
+            zstd = _import_zstandard()
+            cctx = zstd.ZstdCompressor(level=3, threads=-1)
+            binary = stack.enter_context(cctx.stream_writer(raw, closefd=False))
+        else:
+            binary = stack.enter_context(gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6))
+        f = stack.enter_context(io.TextIOWrapper(binary, encoding='utf-8', newline=''))
+        yield f
+
+
+def _as_text(value: Any) -> str:
+    """Render a cell value the way csv.writer would."""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+def _csv_field(value: Any) -> str:
+    """Render and quote a cell exactly as csv.writer (QUOTE_MINIMAL) would."""
+    text = _as_text(value)
+    if '"' in text or ',' in text or '\n' in text or '\r' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _write_all(fd: int, data: bytearray):
+    """os.write until every byte is out (a single call may write less)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+@contextmanager
+def _open_batch_writer(
+    output_file: Path,
+    columns: List[str],
+    output_format: str,
+    write_buffer_size: int,
+    compress: str = "none"
+) -> Iterator[Callable[[List[tuple]], None]]:
+    """
+    Open the export file and yield a function that writes one batch of rows.
+    
+    CSV rows go through csv.writer; Parquet batches become one zstd
+    row group each, with every column stored as an Arrow string array.
+    
+    Uncompressed preview-only CSV takes a fast path: the fixed four-column
+    rows are formatted by hand and written to the raw fd with os.write,
+    byte-identical to csv.writer. --include-full-content and --compress
+    use csv.writer.
+    """
+    if output_format == "parquet":
+        pa, pq = _import_pyarrow()
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        
+        with pq.ParquetWriter(output_file, schema, compression="zstd") as sink:
+            def write_batch(rows: List[tuple]):
+                sink.write_table(pa.Table.from_arrays(
+                    [pa.array([_as_text(v) for v in values], type=pa.string()) for values in zip(*rows)],
+                    schema=schema
+                ))
+            
+            yield write_batch
+    elif compress == "none" and len(columns) == 4:
+        with open(output_file, 'wb', buffering=0) as raw:
+            fd = raw.fileno()
+            buf = bytearray()
+            
+            def write_batch(rows: List[tuple]):
+                buf.extend("".join(
+                    f"{_csv_field(chunk_id)},{_csv_field(source)},{_csv_field(document_type)},{_csv_field(preview)}\r\n"
+                    for chunk_id, source, document_type, preview in rows
+                ).encode("utf-8"))
+                if len(buf) >= write_buffer_size:
+                    _write_all(fd, buf)
+                    buf.clear()
+            
+            write_batch([tuple(columns)])
+            yield write_batch
+            _write_all(fd, buf)
+    else:
+        with _open_text_output(output_file, write_buffer_size, compress) as f:
+            # Encode each batch into a StringIO and hand the file one string,
+            # rather than one write() call per row
+            sio = io.StringIO()
+            writer = csv.writer(sio, quoting=csv.QUOTE_MINIMAL)
+            
+            def write_batch(rows: List[tuple]):
+                writer.writerows(rows)
+                f.write(sio.getvalue())
+                sio.seek(0)
+                sio.truncate(0)
+            
+            write_batch([tuple(columns)])
+            yield write_batch
+
+
+def _encode_batch(
+    payloads: List[Optional[Dict[str, Any]]],
+    preview_length: int,
+    include_full_content: bool
+):
+    """
+    Turn one batch of point payloads into CSV row tuples.
+    
+    Module-level and payload-only so it can run in a worker process.
+    
+    Returns:
+        (rows, counts) - row tuples in column order and per-document_type counts
+    """
+    rows: List[tuple] = []
+    counts: Counter = Counter()
+    for payload in payloads:
+        payload = payload or _EMPTY
+        metadata = payload.get("metadata") or _EMPTY
+        page_content = payload.get("page_content") or ""
+        get = metadata.get
+        document_type = get("document_type", "MISSING")
+        
+        if include_full_content:
+            rows.append((
+                get("chunk_id", "MISSING"),
+                get("source", "MISSING"),
+                document_type,
+                truncate_text(page_content, preview_length),
+                page_content
+            ))
+        else:
+            rows.append((
+                get("chunk_id", "MISSING"),
+                get("source", "MISSING"),
+                document_type,
+                truncate_text(page_content, preview_length)
+            ))
+        counts[document_type] += 1
+    return rows, counts
+
+
+def iter_chunk_batches(
+    client: QdrantClient,
+    collection_name: str,
+    batch_size: int = SCROLL_BATCH_SIZE,
+    payload_selector: Optional[PayloadSelectorInclude] = None
+) -> Iterator[List[Any]]:
+    """
+    Page through a collection with scroll, yielding one list of points per request.
+    
+    Args:
+        client: Connected Qdrant client
+        collection_name: Name of the collection
+        batch_size: Points fetched per scroll request
+        payload_selector: Payload fields to fetch (default: the whole payload)
+    """
+    offset = None
+    while True:
+        points, next_offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=payload_selector if payload_selector is not None else True,
+            with_vectors=False
+        )
+        
+        if not points:
+            return
+        yield points
+        
+        # Check if we're done
+        if next_offset is None:
+            return
+        offset = next_offset
+
+
+def iter_chunks(
+    client: QdrantClient,
+    collection_name: str,
+    batch_size: int = SCROLL_BATCH_SIZE,
+    payload_selector: Optional[PayloadSelectorInclude] = None
+) -> Iterator[Any]:
+    """
+    Lazily yield every point in a collection, one at a time.
+    
+    Pagination is handled here so any consumer (CSV, Parquet, stdout) can
+    iterate a collection without its own scroll loop.
+    """
+    for points in iter_chunk_batches(client, collection_name, batch_size, payload_selector):
+        yield from points
+
+
+def _put_unless_stopped(batches: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put item on the queue, giving up (False) once stop is set."""
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=QUEUE_PUT_TIMEOUT_S)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _scroll_worker(
+    client: QdrantClient,
+    collection_name: str,
+    batch_size: int,
+    payload_selector: PayloadSelectorInclude,
+    batches: queue.Queue,
+    stop: threading.Event
+):
+    """
+    Put each scrolled batch of points on a queue.
+    
+    Finishes with _SCROLL_DONE; a scroll error is queued (as the
+    exception) just before it so the consumer can re-raise it. If the
+    consumer sets stop (it failed), the worker exits instead of blocking
+    on the full queue.
+    """
+    try:
+        for points in iter_chunk_batches(client, collection_name, batch_size, payload_selector):
+            if not _put_unless_stopped(batches, points, stop):
+                return
+    except Exception as e:
+        _put_unless_stopped(batches, e, stop)
+    finally:
+        _put_unless_stopped(batches, _SCROLL_DONE, stop)
+
+
+def connect_qdrant(
+    qdrant_url: str,
+    prefer_grpc: bool = True,
+    grpc_port: int = QDRANT_GRPC_PORT
+) -> QdrantClient:
+    """
+    Connect to Qdrant, preferring gRPC and falling back to REST.
+    
+    gRPC frames scroll pages as protobuf and its C core releases the GIL,
+    so the scroll thread overlaps encoding. Servers that only expose the
+    REST port (e.g. a 6333-only port mapping) still work via the fallback.
+    """
+    if prefer_grpc:
+        client = QdrantClient(url=qdrant_url, prefer_grpc=True, grpc_port=grpc_port, timeout=QDRANT_TIMEOUT_S)
+        try:
+            client.get_collections()
+            return client
+        except Exception as e:
+            print(f"⚠️  gRPC port {grpc_port} unreachable ({type(e).__name__}); falling back to REST")
+            client.close()
+    return QdrantClient(url=qdrant_url, timeout=QDRANT_TIMEOUT_S)
+
+
 def export_chunks_to_csv(
     qdrant_url: str,
     collection_name: str,
     output_path: str,
     include_full_content: bool = False,
-    preview_length: int = 100
+    preview_length: int = 100,
+    write_buffer_size: int = WRITE_BUFFER_SIZE,
+    batch_size: int = SCROLL_BATCH_SIZE,
+    output_format: str = "csv",
+    compress: str = "none",
+    full_content_sidecar: bool = False,
+    prefer_grpc: bool = True,
+    grpc_port: int = QDRANT_GRPC_PORT,
+    pool=None
 ):
     """
-    Export all chunks from Qdrant collection to CSV.
+    Export all chunks from Qdrant collection to CSV (or Parquet).
     
     Args:
         qdrant_url: Qdrant server URL (e.g., "http://localhost:6333")
         collection_name: Name of the collection
-        output_path: Path to output CSV file
+        output_path: Path to output file
         include_full_content: If True, include full page_content in CSV
         preview_length: Length of preview text (default: 100 chars)
+        write_buffer_size: Output file buffer in bytes (default: 1 MiB)
+        batch_size: Points fetched per scroll request (default: 1000)
+        output_format: "csv" or "parquet" (requires pyarrow)
+        compress: CSV compression - "none", "zstd" (requires zstandard) or "gzip"
+        full_content_sidecar: Write full page_content to <output>.full_content.jsonl
+            (one {"chunk_id", "full_content"} object per line) instead of a column
+        prefer_grpc: Scroll over gRPC when the port is reachable, else REST
+        grpc_port: Qdrant gRPC port (default: 6334)
+        pool: Optional multiprocessing pool to encode rows in; owned (and
+            shared across --collections exports) by the caller
     """
     # Connect to Qdrant
     print(f"🌐 Connecting to Qdrant at: {qdrant_url}")
-    client = QdrantClient(url=qdrant_url)
+    client = connect_qdrant(qdrant_url, prefer_grpc, grpc_port)
     
     # Verify collection exists
     if not client.collection_exists(collection_name):
@@ -71,86 +443,173 @@ def export_chunks_to_csv(
     print(f"   Total chunks: {total_points}")
     print()
     
-    # Prepare CSV columns
+    # Prepare CSV columns; full text goes either in a column or the sidecar
     columns = ["chunk_id", "source", "document_type", "preview"]
-    if include_full_content:
+    if full_content_sidecar:
+        include_full_content = False
+    elif include_full_content:
         columns.append("full_content")
     
-    # Collect all chunks
-    chunks_data: List[Dict[str, Any]] = []
-    offset = None
-    batch_size = 100
+    # Rows are written as each batch arrives, so memory stays O(batch_size)
+    output_file = Path(output_path)
+    # Multi-KB page_content is cheaper as JSON lines than as quoted CSV cells
+    sidecar_file = output_file.with_name(f"{output_file.stem}.full_content.jsonl")
+    suffix = COMPRESSION_SUFFIXES.get(compress)
+    if suffix:
+        if output_file.suffix != suffix:
+            output_file = output_file.with_name(output_file.name + suffix)
+        sidecar_file = sidecar_file.with_name(sidecar_file.name + suffix)
+    print(f"💾 Writing to: {output_file}")
+    if full_content_sidecar:
+        print(f"   Full content: {sidecar_file}")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Fetch only the payload fields the export uses. page_content is needed
+    # even for --preview-length 0, whose preview is "..." for non-empty text
+    payload_selector = PayloadSelectorInclude(include=EXPORT_PAYLOAD_KEYS)
+    
+    encode_full_content = include_full_content or full_content_sidecar
+    
+    type_counts: Counter = Counter()
     processed = 0
     
+    # Batches go to the shared encode pool when one is given (--encode-workers)
+    in_flight: deque = deque()
+    
     print("🔄 Retrieving chunks...")
-    while True:
-        # Scroll through collection
-        points, next_offset = client.scroll(
-            collection_name=collection_name,
-            limit=batch_size,
-            offset=offset,
-            with_payload=True,
-            with_vectors=False
+    with ExitStack() as outputs:
+        write_batch = outputs.enter_context(
+            _open_batch_writer(output_file, columns, output_format, write_buffer_size, compress)
         )
+        sidecar = None
+        if full_content_sidecar:
+            sidecar = outputs.enter_context(
+                _open_text_output(sidecar_file, write_buffer_size, compress)
+            )
         
-        if not points:
-            break
-        
-        # Extract metadata and content from each point
-        for point in points:
-            payload = point.payload or {}
-            metadata = payload.get("metadata", {})
-            page_content = payload.get("page_content", "")
-            
-            # Build row data
-            row = {
-                "chunk_id": metadata.get("chunk_id", "MISSING"),
-                "source": metadata.get("source", "MISSING"),
-                "document_type": metadata.get("document_type", "MISSING"),
-                "preview": truncate_text(page_content, preview_length)
-            }
-            
-            if include_full_content:
-                row["full_content"] = page_content
-            
-            chunks_data.append(row)
+        def write_encoded(encoded):
+            rows, counts = encoded
+            if sidecar is not None:
+                # Rows carry full_content last; it goes to the sidecar only
+                sidecar.write("".join(
+                    json.dumps({"chunk_id": row[0], "full_content": row[4]}, ensure_ascii=False) + "\n"
+                    for row in rows
+                ))
+                rows = [row[:4] for row in rows]
+            write_batch(rows)
+            type_counts.update(counts)
         
-        processed += len(points)
-        print(f"   Retrieved {processed}/{total_points} chunks...")
+        # Scroll in a background thread so the next page is in flight while
+        # this thread builds and writes rows (the client releases the GIL
+        # during network I/O); the bounded queue caps buffered batches
+        batches: queue.Queue = queue.Queue(maxsize=SCROLL_QUEUE_SIZE)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=_scroll_worker,
+            args=(client, collection_name, batch_size, payload_selector, batches, stop),
+            daemon=True
+        )
+        producer.start()
         
-        # Check if we're done
-        if next_offset is None:
-            break
-        offset = next_offset
+        # However the loop ends, release the producer (it may be blocked on a
+        # full queue) and wait for it, so no thread is left holding the client
+        try:
+            last_report = time.monotonic()
+            while True:
+                points = batches.get()
+                if points is _SCROLL_DONE:
+                    break
+                if isinstance(points, Exception):
+                    raise points
+                
+                payloads = [point.payload for point in points]
+                if pool is None:
+                    write_encoded(_encode_batch(payloads, preview_length, encode_full_content))
+                else:
+                    # Encode in worker processes; write finished batches in order
+                    in_flight.append(pool.apply_async(
+                        _encode_batch, (payloads, preview_length, encode_full_content)
+                    ))
+                    if len(in_flight) >= MAX_IN_FLIGHT_BATCHES:
+                        write_encoded(in_flight.popleft().get())
+                del payloads
+                
+                processed += len(points)
+                # Throttled: a line per batch floods logs and stalls on piped stdout
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL_S:
+                    print(f"   Retrieved {processed}/{total_points} chunks...")
+                    last_report = now
+            
+            while in_flight:
+                write_encoded(in_flight.popleft().get())
+        finally:
+            stop.set()
+            producer.join()
     
-    print(f"✅ Retrieved {len(chunks_data)} chunks")
+    print(f"✅ Retrieved {processed} chunks")
     print()
-    
-    # Write to CSV
-    print(f"💾 Writing to: {output_path}")
-    output_file = Path(output_path)
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=columns)
-        writer.writeheader()
-        writer.writerows(chunks_data)
-    
-    print(f"✅ Exported {len(chunks_data)} chunks to CSV")
+    print(f"✅ Exported {processed} chunks to {output_format.upper()}")
     print(f"   Location: {output_file.resolve()}")
     print()
     print("📊 Summary by document type:")
     
     # Print summary stats
-    type_counts: Dict[str, int] = {}
-    for chunk in chunks_data:
-        doc_type = chunk["document_type"]
-        type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
-    
     for doc_type, count in sorted(type_counts.items()):
         print(f"   {doc_type}: {count} chunks")
 
 
+def collection_output_path(output_path: str, collection_name: str) -> str:
+    """Per-collection output path: ./chunks.csv -> ./chunks_<collection>.csv"""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_{collection_name}{path.suffix}"))
+
+
+async def export_collections(
+    qdrant_url: str,
+    collection_names: List[str],
+    output_path: str,
+    **export_kwargs
+):
+    """
+    Export several collections concurrently, one file per collection.
+    
+    Each export_chunks_to_csv call runs in its own worker thread; its
+    scrolls release the GIL during network I/O, so the server scans the
+    collections in parallel while Python encodes rows.
+    
+    Args:
+        qdrant_url: Qdrant server URL
+        collection_names: Collections to export
+        output_path: Base output path, suffixed with each collection name
+        **export_kwargs: Passed through to export_chunks_to_csv
+    """
+    # Fail before any export starts rather than mid-way through the others
+    client = connect_qdrant(
+        qdrant_url,
+        export_kwargs.get("prefer_grpc", True),
+        export_kwargs.get("grpc_port", QDRANT_GRPC_PORT)
+    )
+    try:
+        missing = [name for name in collection_names if not client.collection_exists(name)]
+    finally:
+        client.close()
+    if missing:
+        print(f"❌ Error: Collection(s) not found at {qdrant_url}: {', '.join(missing)}")
+        sys.exit(1)
+    
+    await asyncio.gather(*(
+        asyncio.to_thread(
+            export_chunks_to_csv,
+            qdrant_url=qdrant_url,
+            collection_name=collection_name,
+            output_path=collection_output_path(output_path, collection_name),
+            **export_kwargs
+        )
+        for collection_name in collection_names
+    ))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Export Qdrant collection chunks to CSV for inspection and labeling.",
@@ -168,6 +627,12 @@ Examples:
   
   # Different collection
   python tools/view_chunks.py --collection MyCollection
+  
+  # zstd-compressed CSV (writes chunks_export.csv.zst)
+  python tools/view_chunks.py --include-full-content --compress zstd
+  
+  # Several collections at once (writes chunks_export_<name>.csv for each)
+  python tools/view_chunks.py --collections Thudbot_Hints,Thudbot_Web
         """
     )
     
@@ -176,37 +641,129 @@ Examples:
         default="http://localhost:6333",
         help="Qdrant server URL (default: http://localhost:6333)"
     )
+    parser.add_argument(
+        "--grpc-port",
+        type=int,
+        default=QDRANT_GRPC_PORT,
+        help="Qdrant gRPC port used for scrolling; falls back to REST if unreachable (default: 6334)"
+    )
+    parser.add_argument(
+        "--no-grpc",
+        action="store_true",
+        help="Scroll over REST on --qdrant-url only"
+    )
     parser.add_argument(
         "--collection",
         default="Thudbot_Hints",
         help="Collection name (default: Thudbot_Hints)"
     )
+    parser.add_argument(
+        "--collections",
+        help="Comma-separated collection names to export concurrently; "
+             "overrides --collection and suffixes --output with each name"
+    )
     parser.add_argument(
         "--output",
         default="./tools/tef/benchmark/chunks_export.csv",
         help="Output CSV file path (default: ./tools/tef/benchmark/chunks_export.csv)"
     )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output format; parquet requires pyarrow (default: csv)"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["none", "zstd", "gzip"],
+        default="none",
+        help="Compress CSV output on the fly, appending .zst/.gz to the path; "
+             "zstd requires zstandard (default: none)"
+    )
     parser.add_argument(
         "--include-full-content",
         action="store_true",
         help="Include full page_content in CSV (default: preview only)"
     )
+    parser.add_argument(
+        "--full-content-sidecar",
+        action="store_true",
+        help="Write full page_content to <output>.full_content.jsonl keyed by chunk_id "
+             "instead of a CSV column (cheaper for large chunks)"
+    )
     parser.add_argument(
         "--preview-length",
         type=int,
         default=100,
         help="Length of preview text in characters (default: 100)"
     )
+    parser.add_argument(
+        "--scroll-batch-size",
+        type=int,
+        default=SCROLL_BATCH_SIZE,
+        help="Points fetched per scroll request; larger values mean fewer round-trips "
+             "but more memory per batch (default: 1000)"
+    )
+    parser.add_argument(
+        "--write-buffer-size",
+        type=int,
+        default=WRITE_BUFFER_SIZE,
+        help="Output file buffer size in bytes; lower it on slow network filesystems (default: 1 MiB)"
+    )
+    parser.add_argument(
+        "--encode-workers",
+        type=int,
+        default=0,
+        help="Encode rows in this many worker processes, shared by all --collections "
+             "exports and capped at the CPU count; encoding is cheap, so this only "
+             "pays off for very large exports (default: 0, encode in-process)"
+    )
     
     args = parser.parse_args()
+    if args.encode_workers < 0:
+        parser.error("--encode-workers must be 0 or more")
+    if args.format == "parquet" and args.compress != "none":
+        parser.error("--compress applies to CSV output; Parquet is always zstd-compressed")
     
-    export_chunks_to_csv(
-        qdrant_url=args.qdrant_url,
-        collection_name=args.collection,
-        output_path=args.output,
+    output_path = args.output
+    if args.format == "parquet" and Path(output_path).suffix == ".csv":
+        output_path = str(Path(output_path).with_suffix(".parquet"))
+    
+    export_kwargs = dict(
         include_full_content=args.include_full_content,
-        preview_length=args.preview_length
+        preview_length=args.preview_length,
+        write_buffer_size=args.write_buffer_size,
+        batch_size=args.scroll_batch_size,
+        output_format=args.format,
+        compress=args.compress,
+        full_content_sidecar=args.full_content_sidecar,
+        prefer_grpc=not args.no_grpc,
+        grpc_port=args.grpc_port
     )
+    
+    with ExitStack() as stack:
+        if args.encode_workers:
+            # One pool for the whole run. Workers are spawned, not forked:
+            # forking with live gRPC channels and scroll threads isn't safe
+            workers = min(args.encode_workers, os.cpu_count() or 1)
+            export_kwargs["pool"] = stack.enter_context(
+                multiprocessing.get_context("spawn").Pool(processes=workers)
+            )
+            print(f"⚙️  Encoding rows in {workers} worker processes")
+        
+        if args.collections:
+            collection_names = [name.strip() for name in args.collections.split(",") if name.strip()]
+            asyncio.run(export_collections(
+                args.qdrant_url, collection_names, output_path, **export_kwargs
+            ))
+            return
+        
+        export_chunks_to_csv(
+            qdrant_url=args.qdrant_url,
+            collection_name=args.collection,
+            output_path=output_path,
+            **export_kwargs
+        )
 
 
 if __name__ == "__main__":